@@ -0,0 +1,76 @@
+"""
+This benchmark measures the memory used per instance of the model classes, compared to the same classes without
+__slots__. The field values are shared between the instances, so only the instances themselves are measured.
+
+Run it from the repository root with:
+
+    PYTHONPATH=src python benchmarks/model_memory.py
+"""  # NOQA
+
+import dataclasses
+import tracemalloc
+import typing
+
+import yaml
+
+from arcaflow_lib_kubernetes import convert
+from arcaflow_lib_kubernetes._fleet import fleet_kubeconfig
+
+INSTANCES = 10000
+
+
+def without_slots(cls: type) -> type:
+    """
+    This function creates a dataclass with the same fields as cls that keeps its attributes in a __dict__.
+    """  # NOQA
+    namespace: typing.Dict[str, typing.Any] = {
+        "__annotations__": dict(cls.__annotations__)
+    }
+    for field in dataclasses.fields(cls):
+        if field.default is not dataclasses.MISSING:
+            namespace[field.name] = field.default
+    return dataclasses.dataclass(type(cls.__name__, (), namespace))
+
+
+def bytes_per_instance(
+    cls: type, values: typing.Dict[str, typing.Any]
+) -> float:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    instances = [cls(**values) for _ in range(INSTANCES)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del instances
+    return (after - before) / INSTANCES
+
+
+def main():
+    kubeconfig = convert.parse_kubeconfig(yaml.safe_dump(fleet_kubeconfig(1)))
+    samples = [
+        convert.kubeconfig_to_connection(kubeconfig),
+        kubeconfig,
+        kubeconfig.clusters[0],
+        kubeconfig.clusters[0].cluster,
+        kubeconfig.contexts[0],
+        kubeconfig.contexts[0].context,
+        kubeconfig.users[0],
+        kubeconfig.users[0].user,
+    ]
+    print(f"{'class':<26} {'__dict__':>10} {'__slots__':>10} {'saved':>8}")
+    for sample in samples:
+        cls = type(sample)
+        assert "__dict__" not in dir(sample), cls.__name__
+        values = {
+            field.name: getattr(sample, field.name)
+            for field in dataclasses.fields(cls)
+        }
+        plain = bytes_per_instance(without_slots(cls), values)
+        slotted = bytes_per_instance(cls, values)
+        print(
+            f"{cls.__name__:<26} {plain:>8.0f} B {slotted:>8.0f} B "
+            f"{1 - slotted / plain:>7.0%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+This benchmark compares the document loaders used by parse_kubeconfig across kubeconfig sizes.
+
+Run it from the repository root with:
+
+    PYTHONPATH=src python benchmarks/parse_kubeconfig.py
+"""  # NOQA
+
+import json
+import timeit
+
+import yaml
+
+from arcaflow_lib_kubernetes import convert
+from arcaflow_lib_kubernetes._fleet import fleet_kubeconfig
+
+
+def main():
+    loaders = {
+        "yaml.SafeLoader": lambda data: yaml.load(
+            data, Loader=yaml.SafeLoader
+        ),
+        "convert (yaml)": convert._load_document,
+        "convert (json)": convert._load_document,
+    }
+    print(
+        f"{'contexts':>8} {'bytes':>10}  "
+        + "  ".join(f"{n:>16}" for n in loaders)
+    )
+    for contexts in (1, 10, 100, 1000):
+        document = fleet_kubeconfig(contexts)
+        yaml_data = yaml.safe_dump(document)
+        json_data = json.dumps(document)
+        inputs = {
+            "yaml.SafeLoader": yaml_data,
+            "convert (yaml)": yaml_data,
+            "convert (json)": json_data,
+        }
+        number = max(1, 1000 // contexts)
+        timings = []
+        for name, loader in loaders.items():
+            data = inputs[name]
+            assert loader(data) == document
+            seconds = timeit.timeit(lambda: loader(data), number=number)
+            timings.append(f"{seconds / number * 1000:>13.3f} ms")
+        print(f"{contexts:>8} {len(yaml_data):>10}  " + "  ".join(timings))
+
+
+if __name__ == "__main__":
+    main()
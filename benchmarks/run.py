@@ -0,0 +1,167 @@
+"""
+This benchmark suite measures the time and peak memory of the conversion and connection hot paths on synthetic fleet
+kubeconfigs with 1 to 10,000 contexts, with inlined and with file-referenced credentials.
+
+Run it from the repository root with:
+
+    PYTHONPATH=src python benchmarks/run.py
+
+The results are compared against benchmarks/baseline.json and cases that got slower or use more memory than the
+tolerance allows are reported. Commit an updated baseline with --save when a change is expected to move the numbers.
+"""  # NOQA
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+import typing
+
+import yaml
+
+from arcaflow_lib_kubernetes import convert
+from arcaflow_lib_kubernetes._fleet import fleet_kubeconfig
+
+BASELINE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "baseline.json"
+)
+SIZES = (1, 10, 100, 1000, 10000)
+
+
+def cases(
+    sizes: typing.Iterable[int],
+) -> typing.Iterator[typing.Tuple[str, typing.Callable[[], typing.Any]]]:
+    """
+    This function yields the name and the function to measure of every benchmark case.
+    """  # NOQA
+    for inline in (True, False):
+        mode = "inline" if inline else "files"
+        kubeconfig = convert.parse_kubeconfig(
+            yaml.safe_dump(fleet_kubeconfig(1, inline))
+        )
+        connection = convert.kubeconfig_to_connection(kubeconfig)
+
+        yield (
+            f"connection_to_kubeconfig/{mode}",
+            lambda: convert.connection_to_kubeconfig(connection),
+        )
+        yield f"connect/{mode}", lambda: convert.connect(connection).close()
+
+        for size in sizes:
+            data = yaml.safe_dump(fleet_kubeconfig(size, inline))
+            kubeconfig = convert.parse_kubeconfig(data)
+            yield (
+                f"parse_kubeconfig/{mode}/{size}",
+                lambda: convert.parse_kubeconfig(data),
+            )
+            yield (
+                f"kubeconfig_to_connection/{mode}/{size}",
+                lambda: convert.kubeconfig_to_connection(kubeconfig),
+            )
+            yield (
+                f"kubeconfig_to_connections/{mode}/{size}",
+                lambda: convert.kubeconfig_to_connections(kubeconfig),
+            )
+
+
+def measure(
+    func: typing.Callable[[], typing.Any], min_time: float
+) -> typing.Dict[str, float]:
+    """
+    This function returns the best time per call over repeated runs of at least min_time seconds, and the peak
+    memory allocated by a single call.
+    """  # NOQA
+    best = None
+    total = 0.0
+    runs = 0
+    while runs < 3 or total < min_time:
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+        total += elapsed
+        runs += 1
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"seconds": best, "peak_bytes": peak}
+
+
+def compare(
+    results: typing.Dict[str, typing.Dict[str, float]],
+    baseline: typing.Dict[str, typing.Dict[str, float]],
+    tolerance: float,
+) -> typing.List[str]:
+    """
+    This function returns a description of every case that exceeds its baseline by more than the tolerance.
+    """  # NOQA
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        for metric, value in result.items():
+            base = baseline[name].get(metric)
+            if base and value > base * (1 + tolerance):
+                regressions.append(
+                    f"{name} {metric}: {base:.6g} -> {value:.6g} "
+                    f"(+{(value / base - 1) * 100:.0f}%)"
+                )
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--max-contexts",
+        type=int,
+        default=SIZES[-1],
+        help="skip fleet sizes above this number of contexts",
+    )
+    parser.add_argument(
+        "--min-time",
+        type=float,
+        default=0.2,
+        help="minimum number of seconds to repeat each case for",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="allowed relative increase over the baseline",
+    )
+    parser.add_argument(
+        "--save", action="store_true", help="write the results as baseline"
+    )
+    args = parser.parse_args()
+
+    results = {}
+    sizes = [size for size in SIZES if size <= args.max_contexts]
+    for name, func in cases(sizes):
+        results[name] = measure(func, args.min_time)
+        print(
+            f"{name:<45} {results[name]['seconds'] * 1000:>12.3f} ms "
+            f"{results[name]['peak_bytes'] / 1024:>12.1f} KiB",
+            flush=True,
+        )
+
+    if args.save:
+        with open(BASELINE, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write("\n")
+        return 0
+    if not os.path.exists(BASELINE):
+        return 0
+    with open(BASELINE) as f:
+        regressions = compare(results, json.load(f), args.tolerance)
+    for regression in regressions:
+        print(f"regression: {regression}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
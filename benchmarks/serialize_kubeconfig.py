@@ -0,0 +1,52 @@
+"""
+This benchmark compares serialize_kubeconfig with serializing through the kubeconfig schema and yaml.safe_dump across
+kubeconfig sizes.
+
+Run it from the repository root with:
+
+    PYTHONPATH=src python benchmarks/serialize_kubeconfig.py
+"""  # NOQA
+
+import json
+import timeit
+
+import yaml
+
+from arcaflow_lib_kubernetes import convert, model, serialize
+from arcaflow_lib_kubernetes._fleet import fleet_kubeconfig
+
+
+def main():
+    serializers = {
+        "schema + safe_dump": lambda kubeconfig: yaml.safe_dump(
+            model.get_kubeconfig_schema().serialize(kubeconfig)
+        ),
+        "serialize (yaml)": serialize.serialize_kubeconfig,
+        "schema + json": lambda kubeconfig: json.dumps(
+            model.get_kubeconfig_schema().serialize(kubeconfig),
+            separators=(",", ":"),
+        ),
+        "serialize (json)": lambda kubeconfig: serialize.serialize_kubeconfig(
+            kubeconfig, "json"
+        ),
+    }
+    print(f"{'contexts':>8}  " + "  ".join(f"{n:>18}" for n in serializers))
+    for contexts in (1, 10, 100, 1000):
+        kubeconfig = convert.parse_kubeconfig(
+            yaml.safe_dump(fleet_kubeconfig(contexts))
+        )
+        number = max(1, 1000 // contexts)
+        timings = []
+        for serializer in serializers.values():
+            assert (
+                convert.parse_kubeconfig(serializer(kubeconfig)) == kubeconfig
+            )
+            seconds = timeit.timeit(
+                lambda: serializer(kubeconfig), number=number
+            )
+            timings.append(f"{seconds / number * 1000:>15.3f} ms")
+        print(f"{contexts:>8}  " + "  ".join(timings))
+
+
+if __name__ == "__main__":
+    main()
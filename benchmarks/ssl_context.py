@@ -0,0 +1,82 @@
+"""
+This benchmark measures the cost of creating a client and opening its first TLS connection with and without the shared
+SSL context cache, for a single CA certificate and for a CA bundle the size of the certifi bundle.
+
+Run it from the repository root with:
+
+    PYTHONPATH=src python benchmarks/ssl_context.py
+"""  # NOQA
+
+import contextlib
+import http.server
+import os
+import ssl
+import threading
+import timeit
+from unittest import mock
+
+import certifi
+
+from arcaflow_lib_kubernetes import _api_client, convert, model
+
+TEST_DATA = os.path.join(os.path.dirname(__file__), "../src/testdata")
+
+
+def start_server() -> http.server.HTTPServer:
+    server = http.server.ThreadingHTTPServer(
+        ("127.0.0.1", 0), http.server.BaseHTTPRequestHandler
+    )
+    server.daemon_threads = True
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(
+        os.path.join(TEST_DATA, "server.crt"),
+        os.path.join(TEST_DATA, "server.key"),
+    )
+    server.socket = context.wrap_socket(server.socket, server_side=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def connect_once(connection: model.ConnectionParameters) -> None:
+    api_client = convert.connect(connection)
+    assert api_client.warm_up(1) == 1
+    api_client.close()
+
+
+def main():
+    server = start_server()
+    with open(os.path.join(TEST_DATA, "server.crt")) as f:
+        cacert = f.read()
+    with open(certifi.where()) as f:
+        bundle = f.read()
+    host = f"https://127.0.0.1:{server.server_address[1]}"
+    cas = {
+        "single CA": cacert,
+        f"{bundle.count('BEGIN CERTIFICATE') + 1} CAs": bundle + cacert,
+    }
+
+    print(f"{'':>12}  {'per connection':>16}  {'shared':>16}")
+    for name, ca in cas.items():
+        connection = model.ConnectionParameters(host, cacert=ca)
+        number = 50
+        timings = []
+        for shared in (False, True):
+            # Without the shared context urllib3 loads the files for every
+            # connection, as it did before.
+            patch = contextlib.nullcontext()
+            if not shared:
+                patch = mock.patch.object(
+                    _api_client, "shared_ssl_context", lambda args: args
+                )
+            with patch:
+                connect_once(connection)
+                seconds = timeit.timeit(
+                    lambda: connect_once(connection), number=number
+                )
+            timings.append(f"{seconds / number * 1000:>13.3f} ms")
+        print(f"{name:>12}  " + "  ".join(timings))
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,2 +1,31 @@
+from . import model as _model
+from .bulk import *  # NOQA
+from .cache import *  # NOQA
 from .convert import *  # NOQA
+from .credentials import *  # NOQA
+from .exec_credential import *  # NOQA
+from .incluster import *  # NOQA
+from .index import *  # NOQA
+from .instrumentation import *  # NOQA
+from .merge import *  # NOQA
 from .model import *  # NOQA
+from .pem import *  # NOQA
+from .serialize import *  # NOQA
+from .tls import *  # NOQA
+from .token_source import *  # NOQA
+from .validation import *  # NOQA
+from .watch import *  # NOQA
+
+# Without __all__, star imports skip kubeconfig_schema and connection_schema
+# because __getattr__ provides them. The other names are the ones star imports
+# exported before.
+__all__ = [name for name in globals() if not name.startswith("_")] + [  # NOQA
+    "kubeconfig_schema",
+    "connection_schema",
+]
+
+
+def __getattr__(name):
+    if name in ("kubeconfig_schema", "connection_schema"):
+        return getattr(_model, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,561 @@
+"""
+This module holds the parts of the library that depend on the kubernetes package. It is only imported when a
+connection is created, since importing kubernetes takes a significant amount of time.
+"""  # NOQA
+
+import concurrent.futures
+import copy
+import functools
+import logging
+import socket
+import ssl
+import threading
+import time
+import typing
+import weakref
+
+from kubernetes import client
+from kubernetes.client import Configuration, rest
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPSConnectionPool
+from urllib3.util.wait import wait_for_read
+
+from .credentials import CredentialStore
+from .exec_credential import (
+    ExecCredential,
+    default_exec_credential_cache,
+    exec_cluster_info,
+)
+from .model import (
+    ConnectionParameters,
+    ExecConfig,
+    InvalidKubeConfigException,
+)
+from .pem import pem_bytes
+from .tls import default_ssl_context_cache
+from .token_source import token_file_source
+
+# These connection pool arguments carry the TLS material and are updated on
+# the live pools when the credentials of a client are swapped.
+_TLS_POOL_ARGS = (
+    "cert_reqs",
+    "ca_certs",
+    "ca_cert_data",
+    "cert_file",
+    "key_file",
+    "assert_hostname",
+    "server_hostname",
+    "ssl_context",
+)
+
+# These configuration attributes are derived from the connection parameters
+# and replaced by update_connection.
+_CONNECTION_CONFIGURATION_ATTRIBUTES = (
+    "host",
+    "username",
+    "password",
+    "api_key",
+    "api_key_prefix",
+    "refresh_api_key_hook",
+    "verify_ssl",
+    "ssl_ca_cert",
+    "cert_file",
+    "key_file",
+)
+
+# These TLS connection pool arguments are passed on to the connections rather
+# than stored on the pool.
+_TLS_CONNECTION_ARGS = ("ca_cert_data", "ssl_context")
+
+
+def configure(
+    connection: ConnectionParameters, credential_store: CredentialStore
+) -> typing.Tuple[
+    Configuration, typing.List[str], typing.Optional[ExecCredential]
+]:
+    """
+    This function creates the client configuration for the connection parameters.
+
+    :return: the configuration, the credential files acquired from the credential store for it and the exec
+    credentials it uses.
+    """  # NOQA
+    exec_credential, exec_cluster = _exec_credential(connection)
+
+    credential_files = []
+
+    config = Configuration()
+    if connection.cert_file is not None:
+        config.cert_file = connection.cert_file
+    if connection.cert is not None:
+        config.cert_file = credential_store.acquire(pem_bytes(connection.cert))
+        credential_files.append(config.cert_file)
+
+    if connection.key_file is not None:
+        config.key_file = connection.key_file
+
+    if connection.key is not None:
+        config.key_file = credential_store.acquire(pem_bytes(connection.key))
+        credential_files.append(config.key_file)
+
+    config.username = connection.username
+    config.password = connection.password
+    config.api_key_prefix = {"authorization": "Bearer"}
+
+    if connection.bearer_token is not None:
+        config.api_key = {"authorization": connection.bearer_token}
+
+    if connection.bearer_token_file is not None:
+        try:
+            token_source = token_file_source(connection.bearer_token_file)
+        except InvalidKubeConfigException:
+            release_credentials(credential_store, credential_files)
+            raise
+        config.api_key = {"authorization": token_source.token}
+        config.refresh_api_key_hook = token_source.refresh_api_key_hook
+
+    if exec_credential is not None:
+        if exec_credential.token is not None:
+            config.api_key = {"authorization": exec_credential.token}
+            config.refresh_api_key_hook = functools.partial(
+                _refresh_exec_token, connection.exec, exec_cluster
+            )
+        if exec_credential.client_certificate_data is not None:
+            config.cert_file = credential_store.acquire(
+                pem_bytes(exec_credential.client_certificate_data)
+            )
+            credential_files.append(config.cert_file)
+            config.key_file = credential_store.acquire(
+                pem_bytes(exec_credential.client_key_data)
+            )
+            credential_files.append(config.key_file)
+
+    config.verify_ssl = not connection.insecure_skip_tls_verify
+
+    if connection.cacert_file is not None:
+        config.ssl_ca_cert = connection.cacert_file
+    if connection.cacert is not None:
+        config.ssl_ca_cert = credential_store.acquire(
+            pem_bytes(connection.cacert)
+        )
+        credential_files.append(config.ssl_ca_cert)
+
+    if connection.pool_maxsize is not None:
+        config.connection_pool_maxsize = connection.pool_maxsize
+    if connection.retries is not None:
+        config.retries = connection.retries
+
+    config.host = connection.host
+    return config, credential_files, exec_credential
+
+
+def keepalive_socket_options(
+    idle: int,
+) -> typing.List[typing.Tuple[int, int, int]]:
+    """
+    This function returns the urllib3 socket options that enable TCP keep-alive probes after the connection was
+    idle for the given number of seconds.
+    """  # NOQA
+    options = list(HTTPConnection.default_socket_options)
+    options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+    if hasattr(socket, "TCP_KEEPIDLE"):
+        options.append((socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, idle))
+    elif hasattr(socket, "TCP_KEEPALIVE"):
+        options.append((socket.IPPROTO_TCP, socket.TCP_KEEPALIVE, idle))
+    if hasattr(socket, "TCP_KEEPINTVL"):
+        options.append((socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, idle))
+    return options
+
+
+def _tls_files(pool_args: typing.Dict) -> typing.Tuple:
+    return (
+        pool_args.get("ca_certs"),
+        pool_args.get("cert_file"),
+        pool_args.get("key_file"),
+        pool_args.get("cert_reqs") != ssl.CERT_NONE,
+    )
+
+
+def shared_ssl_context(pool_args: typing.Dict) -> typing.Dict:
+    """
+    This function replaces the TLS files in the connection pool arguments with an SSL context shared by all clients
+    using the same files. Without it, urllib3 creates a new context and loads the files into it for every connection.
+
+    If the files cannot be loaded, the arguments are returned unchanged, so the error is reported when connecting.
+    """  # NOQA
+    try:
+        context = default_ssl_context_cache.get(*_tls_files(pool_args))
+    except (OSError, ssl.SSLError):
+        return {**pool_args, "ssl_context": None}
+    return {
+        **pool_args,
+        "ssl_context": context,
+        "ca_certs": None,
+        "cert_file": None,
+        "key_file": None,
+    }
+
+
+class _SharedSSLContext:
+    """
+    This class holds the TLS files of a client. Its connections get the shared SSL context for the current content
+    of the files from it whenever they connect, so that certificates rotated on disk are used by new connections, as
+    they were when urllib3 loaded the files for every connection. Checking the files only costs hashing them.
+    """  # NOQA
+
+    def __init__(self, files: typing.Optional[typing.Tuple]):
+        """
+        :param files: The certificate authority, certificate and key files and the verification setting, or None if
+            the client does not use a shared SSL context.
+        """  # NOQA
+        self.files = files
+
+    def get(self) -> typing.Optional[ssl.SSLContext]:
+        """
+        This function returns the shared SSL context for the current content of the files, or None if there is none,
+        in which case the connection keeps its own TLS settings.
+        """  # NOQA
+        files = self.files
+        if files is None:
+            return None
+        try:
+            return default_ssl_context_cache.get(*files)
+        except (OSError, ssl.SSLError) as e:
+            logging.warning(
+                f"Failed to load the changed TLS files, keeping the "
+                f"previous ones: {e.__str__()}"
+            )
+            return None
+
+
+def _shared_ssl_context_files(
+    pool_args: typing.Dict, shared_pool_args: typing.Dict
+) -> typing.Optional[typing.Tuple]:
+    if shared_pool_args.get("ssl_context") is None:
+        return None
+    return _tls_files(pool_args)
+
+
+class _SharedSSLContextHTTPSConnection(HTTPSConnection):
+    def __init__(self, *args, shared_ssl_context: _SharedSSLContext, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._shared_ssl_context = shared_ssl_context
+
+    def connect(self):
+        context = self._shared_ssl_context.get()
+        if context is not None:
+            self.ssl_context = context
+            self.ca_certs = None
+            self.cert_file = None
+            self.key_file = None
+        super().connect()
+
+
+class _SharedSSLContextHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _SharedSSLContextHTTPSConnection
+
+    def __init__(self, *args, shared_ssl_context: _SharedSSLContext, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.conn_kw["shared_ssl_context"] = shared_ssl_context
+
+
+def _exec_credential(
+    connection: ConnectionParameters,
+) -> typing.Tuple[
+    typing.Optional[ExecCredential], typing.Optional[typing.Dict]
+]:
+    """
+    This function returns the current credentials of the exec credential plugin of the connection, if it has one,
+    and the cluster information passed to the plugin.
+    """  # NOQA
+    if connection.exec is None:
+        return None, None
+    exec_cluster = None
+    if connection.exec.provide_cluster_info:
+        exec_cluster = exec_cluster_info(connection)
+    return (
+        default_exec_credential_cache.get(connection.exec, exec_cluster),
+        exec_cluster,
+    )
+
+
+def _refresh_exec_token(
+    exec_config: ExecConfig,
+    exec_cluster: typing.Optional[typing.Dict],
+    config: Configuration,
+) -> None:
+    """
+    This function is the refresh_api_key_hook of clients authenticating with an exec credential plugin. It is called
+    before every request and runs the plugin again once the token expired.
+    """  # NOQA
+    credential = default_exec_credential_cache.get(exec_config, exec_cluster)
+    if credential.token is not None:
+        config.api_key = {"authorization": credential.token}
+
+
+class CredentialApiClient(client.ApiClient):
+    """
+    This class is an ApiClient that releases the credential files it was configured with when it is closed or
+    garbage collected, and whose credentials can be replaced while it is in use.
+
+    Client certificates returned by an exec credential plugin are replaced by calling update_connection when the
+    plugin returns new ones after they expired, which is checked before every request.
+
+    Replacing the credentials swaps the configuration as a whole. A request reads the configuration once when it
+    adds its credentials and keeps using it for its URL, so it never combines the host of one configuration with the
+    credentials of another.
+    """  # NOQA
+
+    def __init__(
+        self,
+        connection: ConnectionParameters,
+        credential_store: CredentialStore,
+    ):
+        configuration, credential_files, exec_credential = configure(
+            connection, credential_store
+        )
+        self._pinned = threading.local()
+        super().__init__(configuration)
+        # All pools of a client share its TLS material, so it is left out of
+        # the pool keys. This keeps the pools reachable after the TLS material
+        # is swapped by update_connection.
+        pool_manager = self.rest_client.pool_manager
+        pool_args = pool_manager.connection_pool_kw
+        pool_manager.connection_pool_kw = shared_ssl_context(pool_args)
+        pool_manager.key_fn_by_scheme = {
+            scheme: functools.partial(_pool_key_without_tls, key_fn)
+            for scheme, key_fn in pool_manager.key_fn_by_scheme.items()
+        }
+        self._shared_ssl_context = _SharedSSLContext(
+            _shared_ssl_context_files(
+                pool_args, pool_manager.connection_pool_kw
+            )
+        )
+        pool_manager.pool_classes_by_scheme = {
+            **pool_manager.pool_classes_by_scheme,
+            "https": functools.partial(
+                _SharedSSLContextHTTPSConnectionPool,
+                shared_ssl_context=self._shared_ssl_context,
+            ),
+        }
+        if connection.tcp_keepalive is not None:
+            pool_manager.connection_pool_kw["socket_options"] = (
+                keepalive_socket_options(connection.tcp_keepalive)
+            )
+        self._request_timeout: typing.Optional[typing.Tuple] = None
+        if (
+            connection.connect_timeout is not None
+            or connection.read_timeout is not None
+        ):
+            self._request_timeout = (
+                connection.connect_timeout,
+                connection.read_timeout,
+            )
+        self._credential_store = credential_store
+        self._credential_files = credential_files
+        self._credentials_lock = threading.Lock()
+        self._rotation_lock = threading.Lock()
+        self._connection = connection
+        self._exec_certificate = _exec_certificate(exec_credential)
+        self._release_credentials = weakref.finalize(
+            self, release_credentials, credential_store, credential_files
+        )
+
+    @property
+    def configuration(self) -> Configuration:
+        """
+        This property returns the configuration of the client, or the one the request running in the current thread
+        pinned.
+        """  # NOQA
+        pinned = getattr(self._pinned, "configuration", None)
+        if pinned is not None:
+            return pinned
+        return self._configuration
+
+    @configuration.setter
+    def configuration(self, configuration: Configuration) -> None:
+        self._configuration = configuration
+
+    def update_params_for_auth(self, headers, querys, auth_settings):
+        # The request URL is built from the configuration right after this.
+        self._pinned.configuration = self._configuration
+        super().update_params_for_auth(headers, querys, auth_settings)
+
+    def update_connection(self, connection: ConnectionParameters) -> None:
+        """
+        This function replaces the host, credentials and TLS material of the client. Pooled connections are kept;
+        new connections are established with the new TLS material. Requests started before the call keep the previous
+        host and credentials.
+
+        :param connection: The new connection parameters.
+        :raises InvalidConnectionException: If the credentials cannot be obtained, e.g. the exec credential plugin
+        fails. The client is left unchanged.
+        """  # NOQA
+        new_configuration, credential_files, exec_credential = configure(
+            connection, self._credential_store
+        )
+        configuration = copy.copy(self._configuration)
+        for name in _CONNECTION_CONFIGURATION_ATTRIBUTES:
+            setattr(configuration, name, getattr(new_configuration, name))
+        try:
+            new_pool_args = rest.RESTClientObject(
+                configuration
+            ).pool_manager.connection_pool_kw
+            pool_args = shared_ssl_context(new_pool_args)
+        except BaseException:
+            release_credentials(self._credential_store, credential_files)
+            raise
+        shared_ssl_context_files = _shared_ssl_context_files(
+            new_pool_args, pool_args
+        )
+        tls_args = {
+            name: pool_args[name]
+            for name in _TLS_POOL_ARGS
+            if name in pool_args
+        }
+        pool_manager = self.rest_client.pool_manager
+        with self._credentials_lock:
+            self._configuration = configuration
+            self._connection = connection
+            self._exec_certificate = _exec_certificate(exec_credential)
+            self._shared_ssl_context.files = shared_ssl_context_files
+            pool_manager.connection_pool_kw.update(tls_args)
+            for key in pool_manager.pools.keys():
+                pool = pool_manager.pools.get(key)
+                if pool is None or pool.scheme != "https":
+                    continue
+                for name, value in tls_args.items():
+                    if name in _TLS_CONNECTION_ARGS:
+                        pool.conn_kw[name] = value
+                    elif hasattr(pool, name):
+                        setattr(pool, name, value)
+            old_credential_files = list(self._credential_files)
+            self._credential_files[:] = credential_files
+        release_credentials(self._credential_store, old_credential_files)
+
+    def request(self, *args, **kwargs):
+        self._pinned.configuration = None
+        if self._exec_certificate is not None:
+            self._rotate_exec_certificate()
+        if (
+            kwargs.get("_request_timeout") is None
+            and self._request_timeout is not None
+        ):
+            kwargs["_request_timeout"] = self._request_timeout
+        return super().request(*args, **kwargs)
+
+    def _rotate_exec_certificate(self) -> None:
+        """
+        This function switches the client to the client certificate the exec credential plugin currently returns,
+        running the plugin if the previous certificate expired.
+        """  # NOQA
+        with self._rotation_lock:
+            exec_certificate = self._exec_certificate
+            if exec_certificate is None:
+                return
+            exec_credential, _ = _exec_credential(self._connection)
+            if exec_credential is not exec_certificate:
+                self.update_connection(self._connection)
+
+    def warm_up(self, connections: int) -> int:
+        """
+        This function opens connections to the API server ahead of time and puts them into the connection pool, so
+        that the first requests do not wait for the TCP and TLS handshakes. Connections that fail to open are logged
+        and skipped.
+
+        :param connections: The number of connections to open. It is limited to the connection pool size.
+        :return: the number of pooled connections that are open.
+        """  # NOQA
+        connections = min(
+            connections, self.configuration.connection_pool_maxsize
+        )
+        if connections < 1:
+            return 0
+        pool = self.rest_client.pool_manager.connection_from_url(
+            self.configuration.host
+        )
+        pooled = [pool._get_conn() for _ in range(connections)]
+        try:
+            with concurrent.futures.ThreadPoolExecutor(
+                min(connections, 16)
+            ) as executor:
+                opened = sum(executor.map(_open_connection, pooled))
+        finally:
+            for connection in pooled:
+                pool._put_conn(connection)
+        return opened
+
+    def close(self):
+        super().close()
+        self._release_credentials()
+
+
+def _exec_certificate(
+    exec_credential: typing.Optional[ExecCredential],
+) -> typing.Optional[ExecCredential]:
+    if (
+        exec_credential is None
+        or exec_credential.client_certificate_data is None
+    ):
+        return None
+    return exec_credential
+
+
+def _open_connection(connection: HTTPConnection) -> bool:
+    if connection.sock is not None:
+        return True
+    start = time.monotonic()
+    try:
+        connection.connect()
+        if isinstance(connection.sock, ssl.SSLSocket):
+            _read_session_tickets(connection.sock, time.monotonic() - start)
+    except Exception as e:
+        logging.warning(
+            f"Failed to open a connection to {connection.host}: "
+            f"{e.__str__()}"
+        )
+        connection.close()
+        return False
+    return True
+
+
+def _read_session_tickets(sock: ssl.SSLSocket, timeout: float) -> None:
+    """
+    This function processes the session tickets TLS 1.3 servers send after the handshake. Until they are read, the
+    socket is readable, and urllib3 discards readable idle connections as dropped. The tickets arrive within a round
+    trip, so the duration of the handshake is used as the timeout.
+    """  # NOQA
+    if sock.version() != "TLSv1.3":
+        return
+    previous_timeout = sock.gettimeout()
+    try:
+        while wait_for_read(sock, timeout=timeout):
+            timeout = 0.0
+            sock.setblocking(False)
+            try:
+                if sock.recv(1) == b"":
+                    raise ConnectionError("connection closed by the server")
+                raise ConnectionError("unexpected data from the server")
+            except ssl.SSLWantReadError:
+                pass
+    finally:
+        sock.settimeout(previous_timeout)
+
+
+def _pool_key_without_tls(
+    key_fn: typing.Callable[[typing.Dict], typing.Any],
+    request_context: typing.Dict,
+) -> typing.Any:
+    return key_fn(
+        {
+            name: value
+            for name, value in request_context.items()
+            if name not in _TLS_POOL_ARGS
+        }
+    )
+
+
+def release_credentials(
+    credential_store: CredentialStore, credential_files: typing.List[str]
+) -> None:
+    for path in credential_files:
+        credential_store.release(path)
@@ -0,0 +1,85 @@
+"""
+This module generates synthetic fleet kubeconfigs for the unit tests and the benchmarks.
+"""  # NOQA
+
+import base64
+import os
+import typing
+
+TESTDATA = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "testdata"
+)
+CA_FILE = os.path.join(TESTDATA, "ca.crt")
+CERT_FILE = os.path.join(TESTDATA, "client.crt")
+KEY_FILE = os.path.join(TESTDATA, "client.key")
+
+
+def _data(path: str) -> str:
+    with open(path, "rb") as f:
+        return base64.b64encode(f.read()).decode("ascii")
+
+
+def fleet_kubeconfig(
+    contexts: int, inline: bool = True, token: typing.Optional[str] = None
+) -> dict:
+    """
+    This function builds a kubeconfig document with the given number of contexts, each with its own cluster and user.
+    The credentials are either inlined as base64 data or referenced as files from src/testdata. All contexts use the
+    same certificate authority and client certificate, like fleet kubeconfigs often do.
+
+    :param contexts: The number of contexts.
+    :param inline: Inline the credentials instead of referencing files.
+    :param token: The token of all users. By default every user has its own token.
+    :return: the kubeconfig document.
+    """  # NOQA
+    if inline:
+        cluster_credentials = {"certificate-authority-data": _data(CA_FILE)}
+        user_credentials = {
+            "client-certificate-data": _data(CERT_FILE),
+            "client-key-data": _data(KEY_FILE),
+        }
+    else:
+        cluster_credentials = {"certificate-authority": CA_FILE}
+        user_credentials = {
+            "client-certificate": CERT_FILE,
+            "client-key": KEY_FILE,
+        }
+    document = {
+        "apiVersion": "v1",
+        "kind": "Config",
+        "preferences": {},
+        "current-context": "cluster-0",
+        "clusters": [],
+        "contexts": [],
+        "users": [],
+    }
+    for i in range(contexts):
+        name = f"cluster-{i}"
+        document["clusters"].append(
+            {
+                "name": name,
+                "cluster": dict(
+                    cluster_credentials,
+                    server=f"https://{name}.example.com:6443",
+                ),
+            }
+        )
+        document["users"].append(
+            {
+                "name": name,
+                "user": dict(
+                    user_credentials, token=token or f"sha256~{name}"
+                ),
+            }
+        )
+        document["contexts"].append(
+            {
+                "name": name,
+                "context": {
+                    "cluster": name,
+                    "user": name,
+                    "namespace": "default",
+                },
+            }
+        )
+    return document
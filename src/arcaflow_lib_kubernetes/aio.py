@@ -0,0 +1,116 @@
+import asyncio
+import typing
+
+from .convert import connect, kubeconfig_to_connection, parse_kubeconfig
+from .credentials import CredentialStore
+from .index import KubeConfigIndex
+from .model import ConnectionParameters, KubeConfig, KubeConfigException
+
+if typing.TYPE_CHECKING:
+    from kubernetes import client
+
+
+class AsyncConverter:
+    """
+    This class provides asyncio counterparts of parse_kubeconfig, kubeconfig_to_connection and connect. The work,
+    including reading referenced certificate, key and token files, runs in the default executor so that it does not
+    block the event loop. At most max_concurrency operations run at the same time. Import it from
+    arcaflow_lib_kubernetes.aio, the package does not export it so that importing the package does not load asyncio.
+
+    Example usage:
+
+    >>> import asyncio
+    >>> from .convert import test_kubeconfig
+    >>> async def main():
+    ...     converter = AsyncConverter()
+    ...     kubeconfig = await converter.parse_kubeconfig(test_kubeconfig())
+    ...     connection = await converter.kubeconfig_to_connection(kubeconfig)
+    ...     return connection.host
+    >>> asyncio.run(main())
+    'https://127.0.0.1:6443'
+    """  # NOQA
+
+    def __init__(self, max_concurrency: int = 8):
+        """
+        :param max_concurrency: The maximum number of operations running at the same time.
+        """  # NOQA
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def parse_kubeconfig(self, data: str) -> KubeConfig:
+        """
+        This function parses a kubeconfig file into a KubeConfig data structure, see parse_kubeconfig.
+
+        :param data: The KubeConfig data structure.
+        :return: The parsed kubeconfig structure.
+        """  # NOQA
+        return await self._run(parse_kubeconfig, data)
+
+    async def kubeconfig_to_connection(
+        self,
+        kubeconfig: typing.Union[KubeConfig, KubeConfigIndex],
+        inline_files: bool = True,
+        context: typing.Optional[str] = None,
+    ) -> ConnectionParameters:
+        """
+        This function converts a KubeConfig structure into ConnectionParameters, see kubeconfig_to_connection.
+
+        :param kubeconfig: The parsed KubeConfig data structure, or a KubeConfigIndex over it.
+        :param inline_files: Inline referenced external files (e.g. certificates).
+        :param context: The name of the context to convert. Defaults to the current context of the KubeConfig.
+        :return: The Kubernetes connection parameters.
+        """  # NOQA
+        return await self._run(
+            kubeconfig_to_connection, kubeconfig, inline_files, context
+        )
+
+    async def connect(
+        self,
+        connection: ConnectionParameters,
+        credential_store: typing.Optional[CredentialStore] = None,
+    ) -> "client.ApiClient":
+        """
+        This function creates a usable Kubernetes connection from the connection parameters, see connect.
+
+        :param connection: a ConnectionDataStructure
+        :param credential_store: The store to write inline credentials to. Defaults to default_credential_store.
+        :return: a configured Kubernetes API Client
+        """  # NOQA
+        return await self._run(connect, connection, credential_store)
+
+    async def kubeconfigs_to_connections(
+        self,
+        documents: typing.Iterable[str],
+        inline_files: bool = True,
+    ) -> typing.List[typing.Union[ConnectionParameters, KubeConfigException]]:
+        """
+        This function parses many kubeconfig documents and converts their current contexts concurrently. A document
+        that cannot be parsed or converted does not stop the others.
+
+        :param documents: The kubeconfig documents.
+        :param inline_files: Inline referenced external files (e.g. certificates).
+        :return: The connection parameters, or the error, for each document in input order.
+        """  # NOQA
+
+        def convert(data: str) -> ConnectionParameters:
+            return kubeconfig_to_connection(
+                parse_kubeconfig(data), inline_files
+            )
+
+        results = await asyncio.gather(
+            *(self._run(convert, data) for data in documents),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, BaseException) and not isinstance(
+                result, KubeConfigException
+            ):
+                raise result
+        return results
+
+    async def _run(
+        self, func: typing.Callable[..., typing.Any], *args: typing.Any
+    ) -> typing.Any:
+        async with self._semaphore:
+            return await asyncio.to_thread(func, *args)
@@ -0,0 +1,168 @@
+import concurrent.futures
+import os
+import typing
+
+from .convert import kubeconfig_to_connection, parse_kubeconfig
+from .model import (
+    ConnectionParameters,
+    InvalidKubeConfigException,
+    KubeConfigException,
+)
+from .pem import CredentialInterner
+
+BulkResult = typing.Tuple[
+    str, typing.Union[ConnectionParameters, KubeConfigException]
+]
+
+
+def load_kubeconfigs(
+    paths: typing.Iterable[str],
+    inline_files: bool = True,
+    context: typing.Optional[str] = None,
+    max_workers: typing.Optional[int] = None,
+    max_in_flight: typing.Optional[int] = None,
+    chunk_size: int = 16,
+) -> typing.Iterator[BulkResult]:
+    """
+    This function parses kubeconfig files and converts them into ConnectionParameters on a pool of worker processes.
+    The results are yielded as soon as they are ready, in no particular order, together with the path of their file.
+    A file that cannot be loaded does not stop the others, its error is yielded in place of the connection parameters.
+
+    Paths are taken from the iterable and handed to the workers in chunks of chunk_size files. At most max_in_flight
+    chunks are queued or running at any time, so the memory used does not depend on the number of files. Closing the
+    generator early cancels the chunks that have not started yet.
+
+    :param paths: The kubeconfig files to load. The iterable is consumed lazily.
+    :param inline_files: Inline referenced external files (e.g. certificates).
+    :param context: The name of the context to convert. Defaults to the current context of each kubeconfig.
+    :param max_workers: The number of worker processes. Defaults to the number of CPUs.
+    :param max_in_flight: The maximum number of chunks queued or running. Defaults to twice the number of workers.
+    :param chunk_size: The number of files each worker handles per task.
+    :return: an iterator of (path, connection parameters or KubeConfigException) pairs.
+    """  # NOQA
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if max_in_flight is None:
+        max_in_flight = 2 * max_workers
+    if max_in_flight < 1:
+        raise ValueError("max_in_flight must be at least 1")
+
+    chunks = _chunks(iter(paths), chunk_size)
+    executor = concurrent.futures.ProcessPoolExecutor(max_workers)
+    pending: typing.Set[concurrent.futures.Future] = set()
+    try:
+        while True:
+            for chunk in chunks:
+                pending.add(
+                    executor.submit(_load_chunk, chunk, inline_files, context)
+                )
+                if len(pending) >= max_in_flight:
+                    break
+            if len(pending) == 0:
+                return
+            done, pending = concurrent.futures.wait(
+                pending, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            for future in done:
+                yield from future.result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def load_kubeconfig_directory(
+    directory: str,
+    inline_files: bool = True,
+    context: typing.Optional[str] = None,
+    max_workers: typing.Optional[int] = None,
+    max_in_flight: typing.Optional[int] = None,
+    chunk_size: int = 16,
+) -> typing.Iterator[BulkResult]:
+    """
+    This function loads every regular file in a directory as a kubeconfig with load_kubeconfigs. Hidden files are
+    skipped and subdirectories are not descended into.
+
+    :param directory: The directory holding the kubeconfig files.
+    :param inline_files: Inline referenced external files (e.g. certificates).
+    :param context: The name of the context to convert. Defaults to the current context of each kubeconfig.
+    :param max_workers: The number of worker processes. Defaults to the number of CPUs.
+    :param max_in_flight: The maximum number of chunks queued or running. Defaults to twice the number of workers.
+    :param chunk_size: The number of files each worker handles per task.
+    :return: an iterator of (path, connection parameters or KubeConfigException) pairs.
+    :raises OSError: If the directory cannot be listed.
+    """  # NOQA
+    return load_kubeconfigs(
+        _directory_files(os.scandir(directory)),
+        inline_files,
+        context,
+        max_workers,
+        max_in_flight,
+        chunk_size,
+    )
+
+
+def _directory_files(
+    entries: typing.Iterator[os.DirEntry],
+) -> typing.Iterator[str]:
+    with entries:
+        for entry in entries:
+            if not entry.name.startswith(".") and entry.is_file():
+                yield entry.path
+
+
+def _chunks(
+    paths: typing.Iterator[str], chunk_size: int
+) -> typing.Iterator[typing.List[str]]:
+    while True:
+        chunk = [path for _, path in zip(range(chunk_size), paths)]
+        if len(chunk) == 0:
+            return
+        yield chunk
+
+
+def _load_chunk(
+    paths: typing.List[str],
+    inline_files: bool,
+    context: typing.Optional[str],
+) -> typing.List[BulkResult]:
+    # The files of a chunk share their credentials, which pickle keeps
+    # shared on the way back from the worker process.
+    interner = CredentialInterner()
+    return [
+        _load_file(path, inline_files, context, interner) for path in paths
+    ]
+
+
+def _load_file(
+    path: str,
+    inline_files: bool,
+    context: typing.Optional[str],
+    interner: typing.Optional[CredentialInterner] = None,
+) -> BulkResult:
+    try:
+        try:
+            with open(path, "rb") as f:
+                data = f.read().decode("utf-8")
+        except OSError as e:
+            raise InvalidKubeConfigException(
+                f"The kubeconfig file {path} was not readable: {e.__str__()}"
+            ) from e
+        except UnicodeDecodeError as e:
+            raise InvalidKubeConfigException(
+                f"The kubeconfig file {path} is not valid UTF-8: "
+                f"{e.__str__()}"
+            ) from e
+        return path, kubeconfig_to_connection(
+            parse_kubeconfig(data), inline_files, context, interner=interner
+        )
+    except KubeConfigException as e:
+        # The cause is dropped since it may not survive the trip back from
+        # the worker process.
+        return path, type(e)(e.message)
+    except Exception as e:
+        # Any other failure only concerns this file, the others are still
+        # loaded.
+        return path, InvalidKubeConfigException(
+            f"Failed to load the kubeconfig file {path}: {e.__str__()}"
+        )
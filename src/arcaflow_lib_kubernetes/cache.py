@@ -0,0 +1,325 @@
+import collections
+import concurrent.futures
+import copy
+import dataclasses
+import hashlib
+import os
+import threading
+import time
+import typing
+
+from .convert import connect, parse_kubeconfig, resolve_relative_paths
+from .model import (
+    ConnectionParameters,
+    InvalidKubeConfigException,
+    KubeConfig,
+)
+
+if typing.TYPE_CHECKING:
+    from kubernetes import client
+
+
+def connection_fingerprint(connection: ConnectionParameters) -> str:
+    """
+    This function computes a stable fingerprint of the connection parameters. Two connections with the same host, TLS
+    material and authentication fields yield the same fingerprint. Referenced files (e.g. cert_file) are fingerprinted
+    by their path, not by their content.
+
+    :param connection: The connection parameters to fingerprint.
+    :return: a hex-encoded SHA-256 digest.
+    """  # NOQA
+    digest = hashlib.sha256()
+    for field in dataclasses.fields(connection):
+        digest.update(field.name.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(repr(getattr(connection, field.name)).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class LRUCache:
+    """
+    This class is a thread-safe, bounded mapping with least-recently-used and optional time-to-live eviction.
+    """  # NOQA
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl: typing.Optional[float] = None,
+        clock: typing.Callable[[], float] = time.monotonic,
+    ):
+        """
+        :param max_size: The maximum number of entries to keep.
+        :param ttl: The number of seconds after which an entry expires. None disables expiry.
+        :param clock: The monotonic clock used for expiry, replaceable for testing.
+        """  # NOQA
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.max_size = max_size
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: collections.OrderedDict = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: typing.Hashable) -> typing.Optional[typing.Any]:
+        """
+        This function returns the value stored for key and marks it as recently used.
+
+        :param key: The cache key.
+        :return: the cached value, or None if it is missing or expired.
+        """  # NOQA
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires is not None and expires <= self._clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: typing.Hashable, value: typing.Any) -> None:
+        """
+        This function stores value under key, evicting the least recently used entries if the cache is full.
+
+        :param key: The cache key.
+        :param value: The value to store.
+        """  # NOQA
+        expires = None if self.ttl is None else self._clock() + self.ttl
+        with self._lock:
+            self._entries[key] = (value, expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def pop(self, key: typing.Hashable) -> typing.Optional[typing.Any]:
+        """
+        This function removes key from the cache.
+
+        :param key: The cache key.
+        :return: the removed value, or None if the key was not cached.
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        return None if entry is None else entry[0]
+
+    def clear(self) -> None:
+        """
+        This function removes all entries from the cache.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+class ConnectionCache:
+    """
+    This class hands out the same ApiClient for identical connection parameters so that its connection pool (and
+    the TCP/TLS sessions in it) is reused across calls. Evicted clients are dropped from the cache, but not closed,
+    since callers may still be using them.
+
+    It is safe to use from multiple threads. Concurrent callers asking for a client that is not cached yet wait for a
+    single construction of it rather than each creating their own.
+
+    Example usage:
+
+    >>> from .convert import test_kubeconfig, parse_kubeconfig, kubeconfig_to_connection
+    >>> connection = kubeconfig_to_connection(parse_kubeconfig(test_kubeconfig()))
+    >>> cache = ConnectionCache()
+    >>> cache.connect(connection) is cache.connect(connection)
+    True
+    >>> cache.invalidate(connection)
+    True
+    >>> len(cache)
+    0
+    """  # NOQA
+
+    def __init__(
+        self,
+        max_size: int = 16,
+        ttl: typing.Optional[float] = 300.0,
+        clock: typing.Callable[[], float] = time.monotonic,
+    ):
+        """
+        :param max_size: The maximum number of clients to keep.
+        :param ttl: The number of seconds a client is reused for. None disables expiry.
+        :param clock: The monotonic clock used for expiry, replaceable for testing.
+        """  # NOQA
+        self._clients = LRUCache(max_size, ttl, clock)
+        self._in_flight: typing.Dict[str, concurrent.futures.Future] = {}
+        self._lock = threading.Lock()
+
+    def connect(self, connection: ConnectionParameters) -> "client.ApiClient":
+        """
+        This function returns a cached Kubernetes API client for the connection parameters, creating it if needed.
+        If another thread is already creating the client, this function waits for it and returns the same client.
+
+        :param connection: a ConnectionDataStructure
+        :return: a configured Kubernetes API Client
+        """  # NOQA
+        key = connection_fingerprint(connection)
+        api_client = self._clients.get(key)
+        if api_client is not None:
+            return api_client
+        with self._lock:
+            # The client may have been stored since the lookup above.
+            api_client = self._clients.get(key)
+            if api_client is not None:
+                return api_client
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = concurrent.futures.Future()
+                self._in_flight[key] = future
+        if not leader:
+            return future.result()
+
+        try:
+            api_client = connect(connection)
+        except BaseException as e:
+            with self._lock:
+                if self._in_flight.get(key) is future:
+                    del self._in_flight[key]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            # Clients whose construction was invalidated are not cached.
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+                self._clients.put(key, api_client)
+        future.set_result(api_client)
+        return api_client
+
+    def invalidate(self, connection: ConnectionParameters) -> bool:
+        """
+        This function removes the client for the connection parameters from the cache. A client that is being
+        created is handed to the callers waiting for it, but not cached.
+
+        :param connection: The connection parameters to invalidate.
+        :return: True if a client was removed.
+        """  # NOQA
+        key = connection_fingerprint(connection)
+        with self._lock:
+            self._in_flight.pop(key, None)
+            return self._clients.pop(key) is not None
+
+    def clear(self) -> None:
+        """
+        This function removes all clients from the cache.
+        """
+        with self._lock:
+            self._in_flight.clear()
+            self._clients.clear()
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+
+class KubeConfigCache:
+    """
+    This class caches the results of parse_kubeconfig, keyed by a digest of the document, or by path, modification
+    time and size for files. Since KubeConfig objects are mutable, copies are returned by default so that callers
+    cannot corrupt the cached entries.
+
+    Example usage:
+
+    >>> from .convert import test_kubeconfig
+    >>> kubeconfig_cache = KubeConfigCache()
+    >>> kubeconfig_cache.parse(test_kubeconfig()).current_context
+    'default'
+    >>> kubeconfig_cache.parse(test_kubeconfig()).current_context
+    'default'
+    >>> kubeconfig_cache.hits, kubeconfig_cache.misses
+    (1, 1)
+    """  # NOQA
+
+    hits: int
+    misses: int
+
+    def __init__(self, max_size: int = 32, copy_results: bool = True):
+        """
+        :param max_size: The maximum number of documents and files to keep.
+        :param copy_results: Return deep copies of the cached KubeConfig. Disable only if callers never modify results.
+        """  # NOQA
+        self.copy_results = copy_results
+        self.hits = 0
+        self.misses = 0
+        self._documents = LRUCache(max_size)
+        self._files = LRUCache(max_size)
+        self._lock = threading.Lock()
+
+    def parse(self, data: str) -> KubeConfig:
+        """
+        This function parses a kubeconfig document like parse_kubeconfig, returning the cached result if the same
+        document was parsed before.
+
+        :param data: The kubeconfig document.
+        :return: The parsed kubeconfig structure.
+        """  # NOQA
+        key = hashlib.sha256(data.encode("utf-8")).digest()
+        kubeconfig = self._documents.get(key)
+        self._count(kubeconfig is not None)
+        if kubeconfig is None:
+            kubeconfig = parse_kubeconfig(data)
+            self._documents.put(key, kubeconfig)
+        return self._result(kubeconfig)
+
+    def parse_file(self, path: str) -> KubeConfig:
+        """
+        This function reads and parses a kubeconfig file, returning the cached result if neither the modification
+        time nor the size of the file changed since it was last parsed. Relative file paths in the kubeconfig are
+        resolved against the directory of the file.
+
+        :param path: The path of the kubeconfig file.
+        :return: The parsed kubeconfig structure.
+        :raises InvalidKubeConfigException: If the file is not readable or not a valid kubeconfig.
+        """  # NOQA
+        try:
+            stat = os.stat(path)
+        except OSError as e:
+            raise InvalidKubeConfigException(
+                f"The kubeconfig file {path} was not readable: {e.__str__()}"
+            ) from e
+        key = os.path.abspath(path)
+        version = (stat.st_mtime_ns, stat.st_size)
+        entry = self._files.get(key)
+        self._count(entry is not None and entry[0] == version)
+        if entry is not None and entry[0] == version:
+            return self._result(entry[1])
+        try:
+            with open(path) as f:
+                data = f.read()
+        except OSError as e:
+            raise InvalidKubeConfigException(
+                f"The kubeconfig file {path} was not readable: {e.__str__()}"
+            ) from e
+        kubeconfig = parse_kubeconfig(data)
+        resolve_relative_paths(kubeconfig, os.path.dirname(key))
+        self._files.put(key, (version, kubeconfig))
+        return self._result(kubeconfig)
+
+    def clear(self) -> None:
+        """
+        This function removes all cached documents and files and resets the counters.
+        """
+        self._documents.clear()
+        self._files.clear()
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def _count(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def _result(self, kubeconfig: KubeConfig) -> KubeConfig:
+        if self.copy_results:
+            return copy.deepcopy(kubeconfig)
+        return kubeconfig
@@ -1,11 +1,16 @@
-import base64
+import dataclasses
+import functools
+import json
 import logging
-import tempfile
+import os
+import typing
 
 import yaml
-from kubernetes import client
-from kubernetes.client import Configuration
 
+from . import model as _model
+from .credentials import CredentialStore, default_credential_store
+from .index import KubeConfigIndex
+from .instrumentation import phase
 from .model import (
     ConnectionException,
     ConnectionParameters,
@@ -15,12 +20,23 @@ from .model import (
     KubeConfigClusterParams,
     KubeConfigContext,
     KubeConfigContextParams,
+    KubeConfigException,
     KubeConfigUser,
     KubeConfigUserParameters,
     UnusableKubeConfigException,
-    connection_schema,
-    kubeconfig_schema,
+    get_connection_schema,
+    get_kubeconfig_schema,
 )
+from .pem import CredentialInterner, PEMData, pem_base64
+from .validation import ValidationCache
+
+if typing.TYPE_CHECKING:
+    from kubernetes import client
+
+try:
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:
+    from yaml import SafeLoader as _SafeLoader
 
 
 def test_kubeconfig() -> str:
@@ -56,10 +72,24 @@ users:
 """  # NOQA
 
 
+def _load_document(data: str) -> typing.Any:
+    """
+    This function loads a YAML or JSON document. JSON documents are loaded with the json module, YAML documents with
+    the libyaml-based loader if PyYAML was built with it.
+    """  # NOQA
+    if data.lstrip().startswith("{"):
+        try:
+            return json.loads(data)
+        except ValueError:
+            pass
+    return yaml.load(data, Loader=_SafeLoader)
+
+
 def parse_kubeconfig(data: str) -> KubeConfig:
     """
     This function parses a kubeconfig file into a KubeConfig data structure. You may need to use
-    kubeconfig_to_connection to convert it into a usable connection configuration.
+    kubeconfig_to_connection to convert it into a usable connection configuration. Both YAML and JSON kubeconfig
+    files are accepted.
 
     Example usage:
 
@@ -79,15 +109,53 @@ def parse_kubeconfig(data: str) -> KubeConfig:
     :return: The parsed kubeconfig structure.
     """  # NOQA
     try:
-        loaded_data = yaml.safe_load(data)
-        kubeconfig = kubeconfig_schema.unserialize(loaded_data)
+        with phase("load"):
+            loaded_data = _load_document(data)
+        with phase("unserialize"):
+            kubeconfig = get_kubeconfig_schema().unserialize(loaded_data)
         return kubeconfig
     except Exception as e:
         raise InvalidKubeConfigException(e.__str__()) from e
 
 
+def resolve_relative_paths(kubeconfig: KubeConfig, directory: str) -> None:
+    """
+    This function resolves the relative certificate authority, client certificate and client key paths of a
+    kubeconfig, as well as exec plugin commands containing a path separator, against the directory of the file the
+    kubeconfig was read from, like kubectl does. The kubeconfig is modified in place.
+
+    >>> kube_config = parse_kubeconfig(test_kubeconfig())
+    >>> kube_config.users[0].user.client_key = "client.key"
+    >>> resolve_relative_paths(kube_config, "/etc/kubernetes")
+    >>> kube_config.users[0].user.client_key
+    '/etc/kubernetes/client.key'
+
+    :param kubeconfig: The kubeconfig.
+    :param directory: The directory of the kubeconfig file.
+    """  # NOQA
+
+    def resolve(path: typing.Optional[str]) -> typing.Optional[str]:
+        if not path or os.path.isabs(path):
+            return path
+        return os.path.normpath(os.path.join(directory, path))
+
+    for cluster in kubeconfig.clusters:
+        params = cluster.cluster
+        params.certificate_authority = resolve(params.certificate_authority)
+    for user in kubeconfig.users:
+        params = user.user
+        params.client_certificate = resolve(params.client_certificate)
+        params.client_key = resolve(params.client_key)
+        if params.exec is not None and os.sep in params.exec.command:
+            params.exec.command = resolve(params.exec.command)
+
+
 def kubeconfig_to_connection(
-    kubeconfig: KubeConfig, inline_files: bool = True
+    kubeconfig: typing.Union[KubeConfig, KubeConfigIndex],
+    inline_files: bool = True,
+    context: typing.Optional[str] = None,
+    validation_cache: typing.Optional[ValidationCache] = None,
+    interner: typing.Optional[CredentialInterner] = None,
 ) -> ConnectionParameters:
     """
     This function converts a KubeConfig structure into ConnectionParameters.
@@ -100,61 +168,174 @@ def kubeconfig_to_connection(
     >>> connection_config.host
     'https://127.0.0.1:6443'
 
-    :param kubeconfig: The parsed KubeConfig data structure.
+    :param kubeconfig: The parsed KubeConfig data structure, or a KubeConfigIndex over it. Pass an index when
+    converting multiple contexts of the same KubeConfig to avoid re-indexing it on every call.
     :param inline_files: Inline referenced external files (e.g. certificates). Defaults to True to support transporting
     credentials across system boundaries.
+    :param context: The name of the context to convert. Defaults to the current context of the KubeConfig.
+    :param validation_cache: Skip validating connection parameters that already passed validation in this cache,
+    e.g. default_validation_cache. By default the connection parameters are always validated.
+    :param interner: Share certificates, keys and tokens with the connection parameters previously converted with the
+    same interner if their content is identical. By default every call holds its own copy.
     :return: The Kubernetes connection parameters.
-    :raises InvalidKubeConfigException: If the KubeConfig is structurally invalid or references non-existend key/cert
-    files.
+    :raises InvalidKubeConfigException: If the KubeConfig is structurally invalid, references non-existend key/cert
+    files or defines the referenced context, cluster or user more than once.
     :raises UnusableKubeConfigException: If the KubeConfig does not contain enough data to create the connection
     parameters (e.g. no context is set).
     """  # NOQA
-    if kubeconfig.current_context is None or kubeconfig.current_context == "":
+    if isinstance(kubeconfig, KubeConfigIndex):
+        index = kubeconfig
+    else:
+        index = KubeConfigIndex(kubeconfig)
+    if context is None:
+        context = index.kubeconfig.current_context
+    if context is None or context == "":
         raise UnusableKubeConfigException(
             "Unusable KubeConfig: no current context is set."
         )
-    context = None
-    for ctx in kubeconfig.contexts:
-        if ctx.name == kubeconfig.current_context:
-            context = ctx.context
-    if context is None:
-        raise InvalidKubeConfigException(
-            f"Current context {kubeconfig.current_context}"
-            f"not found in kubeconfig file."
-        )
-    current_cluster = context.cluster
-    current_user = context.user
-
-    cluster = None
-    for cl in kubeconfig.clusters:
-        if cl.name == current_cluster:
-            cluster = cl.cluster
-    if cluster is None:
-        raise InvalidKubeConfigException(
-            f"Current cluster {current_cluster} not found in kubeconfig file."
-        )
+    return _context_to_connection(
+        index,
+        context,
+        inline_files,
+        functools.partial(_read_file, interner=interner),
+        validation_cache,
+        interner,
+    )
+
+
+def kubeconfig_to_connections(
+    kubeconfig: typing.Union[KubeConfig, KubeConfigIndex],
+    inline_files: bool = True,
+    validation_cache: typing.Optional[ValidationCache] = None,
+    interner: typing.Optional[CredentialInterner] = None,
+) -> typing.Tuple[
+    typing.Dict[str, ConnectionParameters],
+    typing.Dict[str, KubeConfigException],
+]:
+    """
+    This function converts every context of a KubeConfig structure into ConnectionParameters in a single pass. Files
+    referenced by multiple contexts are only read once. A context that cannot be converted does not stop the
+    conversion of the others, its error is returned instead. Contexts referencing the same cluster and user are only
+    converted and validated once and receive copies of the same connection parameters, and contexts with identical
+    certificates, keys or tokens share a single copy of them.
 
-    user = None
-    for u in kubeconfig.users:
-        if u.name == current_user:
-            user = u.user
-            user_name = u.name
-    if user is None:
-        raise InvalidKubeConfigException(
-            f"Current user {current_user} not found in kubeconfig file."
-        )
+    Example usage:
+
+    >>> config = test_kubeconfig()
+    >>> connections, errors = kubeconfig_to_connections(parse_kubeconfig(config))
+    >>> connections["default"].host
+    'https://127.0.0.1:6443'
+    >>> errors
+    {}
+
+    :param kubeconfig: The parsed KubeConfig data structure, or a KubeConfigIndex over it.
+    :param inline_files: Inline referenced external files (e.g. certificates). Defaults to True to support transporting
+    credentials across system boundaries.
+    :param validation_cache: Skip validating connection parameters that already passed validation in this cache,
+    e.g. default_validation_cache. By default each distinct cluster and user pair is validated.
+    :param interner: Share certificates, keys and tokens with connection parameters converted by other calls using
+    the same interner. Defaults to an interner that only lives for this call.
+    :return: The connection parameters by context name, and the errors by context name for contexts that could not be
+    converted.
+    """  # NOQA
+    if isinstance(kubeconfig, KubeConfigIndex):
+        index = kubeconfig
+    else:
+        index = KubeConfigIndex(kubeconfig)
+    if interner is None:
+        interner = CredentialInterner()
+    read_file = _cached_file_reader(interner)
+    converted: typing.Dict[typing.Tuple[str, str], ConnectionParameters] = {}
+    connections = {}
+    errors = {}
+    for context in index.context_names():
+        try:
+            context_params = index.context(context)
+            key = (context_params.cluster, context_params.user)
+            connection = converted.get(key)
+            if connection is not None:
+                connections[context] = dataclasses.replace(connection)
+                continue
+            connection = _context_to_connection(
+                index,
+                context,
+                inline_files,
+                read_file,
+                validation_cache,
+                interner,
+            )
+            converted[key] = connection
+            connections[context] = connection
+        except KubeConfigException as e:
+            errors[context] = e
+    return connections, errors
+
+
+def _read_file(
+    path: str, interner: typing.Optional[CredentialInterner] = None
+) -> str:
+    with phase("inline_files"), open(path, "rb") as f:
+        if interner is None:
+            return PEMData.from_bytes(f.read())
+        return interner.pem_from_bytes(f.read())
+
+
+def _decode_data(
+    data: str, interner: typing.Optional[CredentialInterner]
+) -> str:
+    with phase("base64_decode"):
+        if interner is None:
+            return PEMData.from_base64(data)
+        return interner.pem_from_base64(data)
+
+
+def _cached_file_reader(
+    interner: typing.Optional[CredentialInterner] = None,
+) -> typing.Callable[[str], str]:
+    """
+    This function returns a variant of _read_file that reads each file at most once, remembering failures as well.
+    """  # NOQA
+    results: typing.Dict[str, typing.Tuple[bool, typing.Any]] = {}
+
+    def read_file(path: str) -> str:
+        if path not in results:
+            try:
+                results[path] = (True, _read_file(path, interner))
+            except Exception as e:
+                results[path] = (False, e)
+        ok, result = results[path]
+        if not ok:
+            raise result
+        return result
+
+    return read_file
+
+
+def _context_to_connection(
+    index: KubeConfigIndex,
+    context: str,
+    inline_files: bool,
+    read_file: typing.Callable[[str], str],
+    validation_cache: typing.Optional[ValidationCache],
+    interner: typing.Optional[CredentialInterner] = None,
+) -> ConnectionParameters:
+    context_params = index.context(context)
+    cluster = index.cluster(context_params.cluster)
+    user = index.user(context_params.user)
+    user_name = context_params.user
 
     if cluster.insecure_skip_tls_verify:
-        logging.warning("You're establishing an insecure connection, "
-                        "do it at your own risk.")
+        logging.warning(
+            "You're establishing an insecure connection, "
+            "do it at your own risk."
+        )
 
     conn = ConnectionParameters(cluster.server)
     conn.insecure_skip_tls_verify = cluster.insecure_skip_tls_verify
     if cluster.certificate_authority is not None:
         if inline_files:
             try:
-                with open(cluster.certificate_authority) as f:
-                    conn.cacert = f.read()
+                conn.cacert = read_file(cluster.certificate_authority)
             except Exception as e:
                 raise InvalidKubeConfigException(
                     f"The referenced certificate authority file "
@@ -166,9 +347,9 @@ def kubeconfig_to_connection(
 
     if cluster.certificate_authority_data is not None:
         try:
-            conn.cacert = base64.b64decode(
-                cluster.certificate_authority_data
-            ).decode("ascii")
+            conn.cacert = _decode_data(
+                cluster.certificate_authority_data, interner
+            )
         except Exception as e:
             raise InvalidKubeConfigException(
                 f"Certificate authority data is not readable: {e.__str__()}"
@@ -177,8 +358,7 @@ def kubeconfig_to_connection(
     if user.client_certificate is not None:
         if inline_files:
             try:
-                with open(user.client_certificate) as f:
-                    conn.cert = f.read()
+                conn.cert = read_file(user.client_certificate)
             except Exception as e:
                 raise InvalidKubeConfigException(
                     f"The referenced user certificate"
@@ -190,9 +370,7 @@ def kubeconfig_to_connection(
 
     if user.client_certificate_data is not None:
         try:
-            conn.cert = base64.b64decode(user.client_certificate_data).decode(
-                "ascii"
-            )
+            conn.cert = _decode_data(user.client_certificate_data, interner)
         except Exception as e:
             raise InvalidKubeConfigException(
                 f"User certificate data is not readable: {e.__str__()}"
@@ -201,8 +379,7 @@ def kubeconfig_to_connection(
     if user.client_key is not None:
         if inline_files:
             try:
-                with open(user.client_key) as f:
-                    conn.key = f.read()
+                conn.key = read_file(user.client_key)
             except Exception as e:
                 raise InvalidKubeConfigException(
                     f"The referenced user key file {user.client_key} was not "
@@ -213,7 +390,7 @@ def kubeconfig_to_connection(
 
     if user.client_key_data is not None:
         try:
-            conn.key = base64.b64decode(user.client_key_data).decode("ascii")
+            conn.key = _decode_data(user.client_key_data, interner)
         except Exception as e:
             raise InvalidKubeConfigException(
                 f"User key data is not readable: {e.__str__()}"
@@ -223,10 +400,16 @@ def kubeconfig_to_connection(
     conn.username = user.username
     conn.password = user.password
     conn.bearer_token = user.token
-
+    if interner is not None:
+        conn.bearer_token = interner.token(user.token)
+    conn.exec = user.exec
 
     try:
-        connection_schema.validate(conn)
+        with phase("validate"):
+            if validation_cache is None:
+                get_connection_schema().validate(conn)
+            else:
+                validation_cache.validate(conn)
     except Exception as e:
         raise UnusableKubeConfigException(e.__str__()) from e
 
@@ -292,9 +475,7 @@ def connection_to_kubeconfig(data: ConnectionParameters) -> KubeConfig:
 
     cluster_params = KubeConfigClusterParams(data.host)
     if data.cacert is not None:
-        cluster_params.certificate_authority_data = base64.b64encode(
-            data.cacert.encode("ascii")
-        ).decode("ascii")
+        cluster_params.certificate_authority_data = pem_base64(data.cacert)
     if data.cacert_file is not None:
         cluster_params.certificate_authority = data.cacert_file
 
@@ -308,16 +489,12 @@ def connection_to_kubeconfig(data: ConnectionParameters) -> KubeConfig:
     # users
     user_params = KubeConfigUserParameters()
     if data.key is not None:
-        user_params.client_key_data = base64.b64encode(
-            data.key.encode("ascii")
-        ).decode("ascii")
+        user_params.client_key_data = pem_base64(data.key)
     if data.key_file is not None:
         user_params.client_key = data.key_file
 
     if data.cert is not None:
-        user_params.client_certificate_data = base64.b64encode(
-            data.cert.encode("ascii")
-        ).decode("ascii")
+        user_params.client_certificate_data = pem_base64(data.cert)
     if data.cert_file is not None:
         user_params.client_certificate = data.cert_file
     if data.bearer_token is not None:
@@ -333,6 +510,7 @@ def connection_to_kubeconfig(data: ConnectionParameters) -> KubeConfig:
                 f"readable: {e.__str__()}"
             ) from e
 
+    user_params.exec = data.exec
     user_params.username = data.username
     user_params.password = data.password
 
@@ -343,59 +521,33 @@ def connection_to_kubeconfig(data: ConnectionParameters) -> KubeConfig:
     return kubeconfig
 
 
-def connect(connection: ConnectionParameters) -> client.ApiClient:
+def connect(
+    connection: ConnectionParameters,
+    credential_store: typing.Optional[CredentialStore] = None,
+    warm_up: int = 0,
+) -> "client.ApiClient":
     """
-    This function creates a usable Kubernetes connection from the connection parameters.
+    This function creates a usable Kubernetes connection from the connection parameters. Inline certificates and keys
+    are stored in the credential store, which shares identical files between clients and removes them once the last
+    client using them is closed.
+
+    The kubernetes package is imported on the first call of this function rather than when this module is imported.
 
     :param connection: a ConnectionDataStructure
+    :param credential_store: The store to write inline credentials to. Defaults to default_credential_store.
+    :param warm_up: The number of connections to the API server to open ahead of time, see
+    CredentialApiClient.warm_up.
     :return: a configured Kubernetes API Client
     """  # NOQA
-
-    config = Configuration()
-    if connection.cert_file is not None:
-        config.cert_file = connection.cert_file
-    if connection.cert is not None:
-        with tempfile.NamedTemporaryFile(delete=False) as temp_file:
-            temp_file.write(bytes(connection.cert, "ascii"))
-            config.cert_file = temp_file.name
-
-    if connection.key_file is not None:
-        config.key_file = connection.key_file
-
-    if connection.key is not None:
-        with tempfile.NamedTemporaryFile(delete=False) as temp_file:
-            temp_file.write(bytes(connection.key, "ascii"))
-            config.key_file = temp_file.name
-
-    config.username = connection.username
-    config.password = connection.password
-    config.api_key_prefix = {"authorization": "Bearer"}
-
-    if connection.bearer_token is not None:
-        config.api_key = {"authorization": connection.bearer_token}
-
-    if connection.bearer_token_file is not None:
-        try:
-            with open(connection.bearer_token_file) as f:
-                config.api_key = f.read()
-        except Exception as e:
-            raise InvalidKubeConfigException(
-                f"The referenced bearer token file "
-                f"{connection.bearer_token_file} was not "
-                f"readable: {e.__str__()}"
-            ) from e
-
-    config.verify_ssl = not connection.insecure_skip_tls_verify
-
-    if connection.cacert_file is not None:
-        config.ssl_ca_cert = connection.cacert_file
-    if connection.cacert is not None:
-        with tempfile.NamedTemporaryFile(delete=False) as temp_file:
-            temp_file.write(bytes(connection.cacert, "ascii"))
-            config.ssl_ca_cert = temp_file.name
-
-    config.host = connection.host
-    api_client = client.ApiClient(config)
+    from ._api_client import CredentialApiClient
+
+    if credential_store is None:
+        credential_store = default_credential_store
+    with phase("api_client"):
+        api_client = CredentialApiClient(connection, credential_store)
+    if warm_up > 0:
+        with phase("warm_up"):
+            api_client.warm_up(warm_up)
     return api_client
 
 
@@ -403,3 +555,11 @@ if __name__ == "__main__":
     import doctest
 
     doctest.testmod()
+
+
+def __getattr__(name: str) -> typing.Any:
+    # kubeconfig_schema and connection_schema used to be imported from model
+    # at import time; they are still available as module attributes.
+    if name in ("kubeconfig_schema", "connection_schema"):
+        return getattr(_model, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
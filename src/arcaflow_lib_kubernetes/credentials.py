@@ -0,0 +1,139 @@
+import hashlib
+import os
+import tempfile
+import threading
+import typing
+from dataclasses import dataclass
+
+from .instrumentation import phase
+
+
+def _default_directory() -> str:
+    """
+    This function returns the directory credential files are written to if memfd is not available. It prefers the
+    tmpfs-backed /dev/shm so that key material does not hit the disk.
+    """  # NOQA
+    shm = "/dev/shm"
+    if os.path.isdir(shm) and os.access(shm, os.W_OK | os.X_OK):
+        return shm
+    return tempfile.gettempdir()
+
+
+@dataclass
+class _CredentialFile:
+    path: str
+    fd: typing.Optional[int]
+    refs: int
+
+
+class CredentialStore:
+    """
+    This class stores PEM blobs in files so they can be passed to libraries that only accept file paths. Each
+    distinct blob is written once, shared by all users and removed when the last user releases it.
+
+    By default the files are anonymous memfd files (Linux), falling back to /dev/shm and the system temporary
+    directory.
+
+    Example usage:
+
+    >>> store = CredentialStore()
+    >>> path = store.acquire(b"-----BEGIN CERTIFICATE-----")
+    >>> store.acquire(b"-----BEGIN CERTIFICATE-----") == path
+    True
+    >>> with open(path, "rb") as f:
+    ...     f.read()
+    b'-----BEGIN CERTIFICATE-----'
+    >>> store.release(path)
+    >>> store.release(path)
+    >>> len(store)
+    0
+    """  # NOQA
+
+    def __init__(
+        self,
+        directory: typing.Optional[str] = None,
+        use_memfd: bool = True,
+    ):
+        """
+        :param directory: The directory to write credential files to. Defaults to /dev/shm or the temp directory.
+        :param use_memfd: Use anonymous memory files where the platform supports them. Ignored if directory is set.
+        """  # NOQA
+        self._directory = directory
+        self._use_memfd = (
+            directory is None
+            and use_memfd
+            and hasattr(os, "memfd_create")
+            and os.path.isdir("/proc/self/fd")
+        )
+        self._files: typing.Dict[str, _CredentialFile] = {}
+        self._paths: typing.Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, data: bytes) -> str:
+        """
+        This function returns the path of a file holding data, writing it only if no such file exists yet. Every call
+        must be matched by a call to release.
+
+        :param data: The credential content.
+        :return: the path of the file holding the data.
+        """  # NOQA
+        digest = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            credential_file = self._files.get(digest)
+            if credential_file is None:
+                with phase("credential_write"):
+                    credential_file = self._write(data)
+                self._files[digest] = credential_file
+                self._paths[credential_file.path] = digest
+            credential_file.refs += 1
+            return credential_file.path
+
+    def release(self, path: str) -> None:
+        """
+        This function drops a reference obtained from acquire, removing the file when no references remain.
+
+        :param path: The path returned by acquire.
+        """  # NOQA
+        with self._lock:
+            digest = self._paths.get(path)
+            if digest is None:
+                return
+            credential_file = self._files[digest]
+            credential_file.refs -= 1
+            if credential_file.refs > 0:
+                return
+            del self._files[digest]
+            del self._paths[path]
+        self._remove(credential_file)
+
+    def _write(self, data: bytes) -> _CredentialFile:
+        if self._use_memfd:
+            fd = os.memfd_create("arcaflow-credential")
+            written = 0
+            while written < len(data):
+                written += os.write(fd, data[written:])
+            return _CredentialFile(f"/proc/self/fd/{fd}", fd, 0)
+        directory = self._directory or _default_directory()
+        fd, path = tempfile.mkstemp(
+            prefix="arcaflow-", suffix=".pem", dir=directory
+        )
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        return _CredentialFile(path, None, 0)
+
+    @staticmethod
+    def _remove(credential_file: _CredentialFile) -> None:
+        if credential_file.fd is not None:
+            os.close(credential_file.fd)
+        else:
+            try:
+                os.unlink(credential_file.path)
+            except FileNotFoundError:
+                pass
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._files)
+
+
+default_credential_store = CredentialStore()
@@ -0,0 +1,273 @@
+import concurrent.futures
+import dataclasses
+import datetime
+import json
+import os
+import subprocess
+import threading
+import time
+import typing
+
+from .model import (
+    ConnectionParameters,
+    ExecConfig,
+    InvalidConnectionException,
+)
+from .pem import PEMData, pem_base64
+
+SUPPORTED_API_VERSIONS = (
+    "client.authentication.k8s.io/v1",
+    "client.authentication.k8s.io/v1beta1",
+)
+
+
+@dataclasses.dataclass(slots=True)
+class ExecCredential:
+    """
+    This class holds the credentials an exec credential plugin returned. The certificate and key are PEM-encoded, the
+    expiration timestamp is in seconds since the epoch and None if the credentials do not expire.
+    """  # NOQA
+
+    token: typing.Optional[str] = None
+    client_certificate_data: typing.Optional[str] = None
+    client_key_data: typing.Optional[str] = None
+    expiration_timestamp: typing.Optional[float] = None
+
+
+def exec_cluster_info(connection: ConnectionParameters) -> typing.Dict:
+    """
+    This function returns the cluster information passed to exec credential plugins that set provideClusterInfo.
+    """  # NOQA
+    cluster = {"server": connection.host}
+    if connection.server_name is not None:
+        cluster["tls-server-name"] = connection.server_name
+    if connection.insecure_skip_tls_verify:
+        cluster["insecure-skip-tls-verify"] = True
+    if connection.cacert is not None:
+        cluster["certificate-authority-data"] = pem_base64(connection.cacert)
+    return cluster
+
+
+def run_exec_plugin(
+    exec_config: ExecConfig,
+    cluster: typing.Optional[typing.Dict] = None,
+    timeout: typing.Optional[float] = 60.0,
+) -> ExecCredential:
+    """
+    This function runs an exec credential plugin and returns the credentials it printed. The command is never run
+    interactively.
+
+    :param exec_config: The exec credential plugin configuration.
+    :param cluster: The cluster information to pass if the plugin sets provideClusterInfo, see exec_cluster_info.
+    :param timeout: The number of seconds to wait for the command to finish.
+    :return: the credentials.
+    :raises InvalidConnectionException: If the command cannot be run, fails or prints an invalid ExecCredential.
+    """  # NOQA
+    if exec_config.api_version not in SUPPORTED_API_VERSIONS:
+        raise InvalidConnectionException(
+            f"Unsupported exec credential plugin API version "
+            f"{exec_config.api_version}, expected one of "
+            f"{', '.join(SUPPORTED_API_VERSIONS)}"
+        )
+    if exec_config.interactive_mode == "Always":
+        raise InvalidConnectionException(
+            f"The exec credential plugin {exec_config.command} requires an "
+            f"interactive terminal, which is not supported."
+        )
+    spec: typing.Dict[str, typing.Any] = {"interactive": False}
+    if exec_config.provide_cluster_info and cluster is not None:
+        spec["cluster"] = cluster
+    env = dict(os.environ)
+    for env_var in exec_config.env or []:
+        env[env_var.name] = env_var.value
+    env["KUBERNETES_EXEC_INFO"] = json.dumps(
+        {
+            "apiVersion": exec_config.api_version,
+            "kind": "ExecCredential",
+            "spec": spec,
+        }
+    )
+
+    try:
+        result = subprocess.run(
+            [exec_config.command] + list(exec_config.args or []),
+            env=env,
+            stdin=subprocess.DEVNULL,
+            capture_output=True,
+            timeout=timeout,
+        )
+    except (OSError, subprocess.SubprocessError) as e:
+        message = (
+            f"The exec credential plugin {exec_config.command} could not be "
+            f"run: {e.__str__()}"
+        )
+        if exec_config.install_hint:
+            message += f"\n{exec_config.install_hint}"
+        raise InvalidConnectionException(message) from e
+    if result.returncode != 0:
+        raise InvalidConnectionException(
+            f"The exec credential plugin {exec_config.command} exited with "
+            f"status {result.returncode}: "
+            f"{result.stderr.decode('utf-8', 'replace').strip()}"
+        )
+    return _parse_exec_credential(exec_config, result.stdout)
+
+
+def _parse_exec_credential(
+    exec_config: ExecConfig, output: bytes
+) -> ExecCredential:
+    try:
+        document = json.loads(output)
+        if document.get("kind") != "ExecCredential":
+            raise ValueError(f"unexpected kind {document.get('kind')!r}")
+        if document.get("apiVersion") != exec_config.api_version:
+            raise ValueError(
+                f"unexpected apiVersion {document.get('apiVersion')!r}"
+            )
+        status = document.get("status") or {}
+        credential = ExecCredential(
+            token=status.get("token"),
+            client_certificate_data=status.get("clientCertificateData"),
+            client_key_data=status.get("clientKeyData"),
+        )
+        if (credential.client_certificate_data is None) != (
+            credential.client_key_data is None
+        ):
+            raise ValueError(
+                "the status holds a client certificate without a key or a "
+                "key without a certificate"
+            )
+        if (
+            credential.token is None
+            and credential.client_certificate_data is None
+        ):
+            raise ValueError(
+                "the status holds neither a token nor a client certificate "
+                "and key"
+            )
+        expiration = status.get("expirationTimestamp")
+        if expiration is not None:
+            credential.expiration_timestamp = datetime.datetime.fromisoformat(
+                expiration
+            ).timestamp()
+    except (ValueError, AttributeError, TypeError) as e:
+        raise InvalidConnectionException(
+            f"The exec credential plugin {exec_config.command} printed an "
+            f"invalid ExecCredential: {e.__str__()}"
+        ) from e
+    if credential.client_certificate_data is not None:
+        credential.client_certificate_data = PEMData(
+            credential.client_certificate_data
+        )
+        credential.client_key_data = PEMData(credential.client_key_data)
+    return credential
+
+
+class ExecCredentialCache:
+    """
+    This class runs exec credential plugins and caches the credentials they return until they expire. Concurrent
+    callers asking for the credentials of the same plugin share a single run of it.
+
+    Credentials without an expiration timestamp are kept until invalidate() or clear() is called.
+    """  # NOQA
+
+    def __init__(
+        self,
+        refresh_margin: float = 10.0,
+        timeout: typing.Optional[float] = 60.0,
+        clock: typing.Callable[[], float] = time.time,
+    ):
+        """
+        :param refresh_margin: The number of seconds before their expiration credentials are refreshed.
+        :param timeout: The number of seconds to wait for a plugin to finish.
+        :param clock: The wall clock expiration timestamps are compared with, replaceable for testing.
+        """  # NOQA
+        self.refresh_margin = refresh_margin
+        self.timeout = timeout
+        self._clock = clock
+        self._credentials: typing.Dict[typing.Hashable, ExecCredential] = {}
+        self._in_flight: typing.Dict[
+            typing.Hashable, concurrent.futures.Future
+        ] = {}
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        exec_config: ExecConfig,
+        cluster: typing.Optional[typing.Dict] = None,
+    ) -> ExecCredential:
+        """
+        This function returns the credentials of an exec credential plugin, running it if there are no cached,
+        unexpired credentials.
+
+        :param exec_config: The exec credential plugin configuration.
+        :param cluster: The cluster information to pass if the plugin sets provideClusterInfo, see exec_cluster_info.
+        :return: the credentials.
+        :raises InvalidConnectionException: If the plugin fails.
+        """  # NOQA
+        key = self._key(exec_config, cluster)
+        with self._lock:
+            credential = self._credentials.get(key)
+            if credential is not None and not self._expired(credential):
+                return credential
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = concurrent.futures.Future()
+                self._in_flight[key] = future
+        if not leader:
+            return future.result()
+
+        try:
+            credential = run_exec_plugin(exec_config, cluster, self.timeout)
+        except BaseException as e:
+            with self._lock:
+                del self._in_flight[key]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            self._credentials[key] = credential
+            del self._in_flight[key]
+        future.set_result(credential)
+        return credential
+
+    def invalidate(
+        self,
+        exec_config: ExecConfig,
+        cluster: typing.Optional[typing.Dict] = None,
+    ) -> bool:
+        """
+        This function drops the cached credentials of an exec credential plugin, e.g. after they were rejected.
+
+        :return: True if credentials were cached.
+        """  # NOQA
+        with self._lock:
+            return (
+                self._credentials.pop(self._key(exec_config, cluster), None)
+                is not None
+            )
+
+    def clear(self) -> None:
+        """
+        This function drops all cached credentials.
+        """
+        with self._lock:
+            self._credentials.clear()
+
+    def _expired(self, credential: ExecCredential) -> bool:
+        return (
+            credential.expiration_timestamp is not None
+            and credential.expiration_timestamp - self.refresh_margin
+            <= self._clock()
+        )
+
+    @staticmethod
+    def _key(
+        exec_config: ExecConfig, cluster: typing.Optional[typing.Dict]
+    ) -> typing.Hashable:
+        if not exec_config.provide_cluster_info:
+            cluster = None
+        return repr(exec_config), json.dumps(cluster, sort_keys=True)
+
+
+default_exec_credential_cache = ExecCredentialCache()
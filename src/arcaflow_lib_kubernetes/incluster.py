@@ -0,0 +1,90 @@
+import dataclasses
+import functools
+import os
+import typing
+
+from .model import (
+    ConnectionParameters,
+    InvalidConnectionException,
+    get_connection_schema,
+)
+
+SERVICE_ACCOUNT_PATH = "/var/run/secrets/kubernetes.io/serviceaccount"
+
+
+def in_cluster_connection(
+    mount_path: str = SERVICE_ACCOUNT_PATH,
+    inline_files: bool = False,
+    environ: typing.Optional[typing.Mapping[str, str]] = None,
+) -> ConnectionParameters:
+    """
+    This function creates the connection parameters for the Kubernetes cluster the process is running in, from the
+    service account mount and the KUBERNETES_SERVICE_HOST and KUBERNETES_SERVICE_PORT environment variables. The
+    result is cached; each call returns a copy of it.
+
+    :param mount_path: The directory the service account is mounted in.
+    :param inline_files: Inline the CA certificate and token instead of referencing the files. Defaults to False so
+    that rotated tokens are picked up.
+    :param environ: The environment to read the service host and port from. Defaults to os.environ.
+    :return: The Kubernetes connection parameters.
+    :raises InvalidConnectionException: If the process is not running in a Kubernetes cluster or the service account
+    files are not readable.
+    """  # NOQA
+    if environ is None:
+        environ = os.environ
+    host = environ.get("KUBERNETES_SERVICE_HOST", "")
+    port = environ.get("KUBERNETES_SERVICE_PORT", "")
+    if host == "" or port == "":
+        raise InvalidConnectionException(
+            "Not running in a Kubernetes cluster: KUBERNETES_SERVICE_HOST "
+            "and KUBERNETES_SERVICE_PORT must be set."
+        )
+    return dataclasses.replace(
+        _in_cluster_connection(mount_path, host, port, inline_files)
+    )
+
+
+def clear_in_cluster_cache() -> None:
+    """
+    This function drops the cached result of in_cluster_connection, e.g. after the service account was remounted.
+    """  # NOQA
+    _in_cluster_connection.cache_clear()
+
+
+@functools.lru_cache(maxsize=8)
+def _in_cluster_connection(
+    mount_path: str, host: str, port: str, inline_files: bool
+) -> ConnectionParameters:
+    if ":" in host:
+        host = f"[{host}]"
+    conn = ConnectionParameters(f"https://{host}:{port}")
+    cacert_file = os.path.join(mount_path, "ca.crt")
+    token_file = os.path.join(mount_path, "token")
+    if inline_files:
+        conn.cacert = _read_service_account_file(cacert_file)
+        conn.bearer_token = _read_service_account_file(token_file)
+    else:
+        for path in (cacert_file, token_file):
+            if not os.path.isfile(path):
+                raise InvalidConnectionException(
+                    f"The service account file {path} does not exist."
+                )
+        conn.cacert_file = cacert_file
+        conn.bearer_token_file = token_file
+
+    try:
+        get_connection_schema().validate(conn)
+    except Exception as e:
+        raise InvalidConnectionException(e.__str__()) from e
+    return conn
+
+
+def _read_service_account_file(path: str) -> str:
+    try:
+        with open(path) as f:
+            return f.read()
+    except OSError as e:
+        raise InvalidConnectionException(
+            f"The service account file {path} was not readable: "
+            f"{e.__str__()}"
+        ) from e
@@ -0,0 +1,116 @@
+import typing
+
+from .model import (
+    InvalidKubeConfigException,
+    KubeConfig,
+    KubeConfigClusterParams,
+    KubeConfigContextParams,
+    KubeConfigUserParameters,
+)
+
+
+def _index_by_name(
+    entries: typing.List[typing.Any], attribute: str
+) -> typing.Tuple[typing.Dict[str, typing.Any], typing.Set[str]]:
+    index = {}
+    duplicates = set()
+    for entry in entries:
+        if entry.name in index:
+            duplicates.add(entry.name)
+        else:
+            index[entry.name] = getattr(entry, attribute)
+    return index, duplicates
+
+
+class KubeConfigIndex:
+    """
+    This class is a read-only view of a KubeConfig that resolves contexts, clusters and users by name in constant
+    time. The index is built once; changes to the KubeConfig made afterwards are not reflected.
+
+    Looking up a name that occurs more than once in its section raises an InvalidKubeConfigException, since it is
+    ambiguous which entry is meant.
+
+    Example usage:
+
+    >>> from .convert import test_kubeconfig, parse_kubeconfig
+    >>> index = KubeConfigIndex(parse_kubeconfig(test_kubeconfig()))
+    >>> index.context("default").user
+    'testuser'
+    >>> index.cluster("default").server
+    'https://127.0.0.1:6443'
+    >>> index.duplicate_users
+    set()
+    """  # NOQA
+
+    kubeconfig: KubeConfig
+    duplicate_contexts: typing.Set[str]
+    duplicate_clusters: typing.Set[str]
+    duplicate_users: typing.Set[str]
+
+    def __init__(self, kubeconfig: KubeConfig):
+        """
+        :param kubeconfig: The parsed KubeConfig data structure.
+        """
+        self.kubeconfig = kubeconfig
+        self._contexts, self.duplicate_contexts = _index_by_name(
+            kubeconfig.contexts, "context"
+        )
+        self._clusters, self.duplicate_clusters = _index_by_name(
+            kubeconfig.clusters, "cluster"
+        )
+        self._users, self.duplicate_users = _index_by_name(
+            kubeconfig.users, "user"
+        )
+
+    def context_names(self) -> typing.List[str]:
+        """
+        This function returns the names of all contexts in the order they appear in the KubeConfig.
+        """  # NOQA
+        return list(self._contexts)
+
+    def context(self, name: str) -> KubeConfigContextParams:
+        """
+        This function returns the context with the given name.
+
+        :raises InvalidKubeConfigException: If the context does not exist or is defined more than once.
+        """  # NOQA
+        return self._lookup(
+            self._contexts, self.duplicate_contexts, "context", name
+        )
+
+    def cluster(self, name: str) -> KubeConfigClusterParams:
+        """
+        This function returns the cluster with the given name.
+
+        :raises InvalidKubeConfigException: If the cluster does not exist or is defined more than once.
+        """  # NOQA
+        return self._lookup(
+            self._clusters, self.duplicate_clusters, "cluster", name
+        )
+
+    def user(self, name: str) -> KubeConfigUserParameters:
+        """
+        This function returns the user with the given name.
+
+        :raises InvalidKubeConfigException: If the user does not exist or is defined more than once.
+        """  # NOQA
+        return self._lookup(self._users, self.duplicate_users, "user", name)
+
+    @staticmethod
+    def _lookup(
+        index: typing.Dict[str, typing.Any],
+        duplicates: typing.Set[str],
+        kind: str,
+        name: str,
+    ) -> typing.Any:
+        entry = index.get(name)
+        if entry is None:
+            raise InvalidKubeConfigException(
+                f"Current {kind} {name} not found in kubeconfig file."
+            )
+        if name in duplicates:
+            raise InvalidKubeConfigException(
+                f"Current {kind} {name} is defined more than once "
+                f"in kubeconfig file."
+            )
+        return entry
@@ -0,0 +1,143 @@
+import threading
+import time
+import typing
+
+PhaseRecorder = typing.Callable[[str, float], None]
+
+_recorder: typing.Optional[PhaseRecorder] = None
+
+
+def set_instrumentation(
+    recorder: typing.Optional[PhaseRecorder],
+) -> typing.Optional[PhaseRecorder]:
+    """
+    This function installs a function that is called with the name and duration in seconds of every phase the library
+    runs through. The phases are:
+
+    - load: loading the YAML or JSON kubeconfig document
+    - unserialize: unserializing the document into a KubeConfig
+    - inline_files: reading referenced certificate and key files
+    - base64_decode: decoding inline certificate and key data
+    - validate: validating the resulting ConnectionParameters
+    - credential_write: writing inline credentials to files for the client
+    - api_client: creating the Kubernetes API client
+    - ssl_context: loading certificate and key files into a shared SSL context
+    - warm_up: opening pooled connections ahead of time
+
+    Pass None to turn instrumentation off, which is the default.
+
+    :param recorder: The function to call, e.g. a PhaseMetrics instance.
+    :return: the previously installed function.
+    """  # NOQA
+    global _recorder
+    previous = _recorder
+    _recorder = recorder
+    return previous
+
+
+class _NoPhase:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        pass
+
+    def __exit__(self, *args) -> None:
+        pass
+
+
+_NO_PHASE = _NoPhase()
+
+
+class _Phase:
+    __slots__ = ("_name", "_recorder", "_start")
+
+    def __init__(self, name: str, recorder: PhaseRecorder):
+        self._name = name
+        self._recorder = recorder
+
+    def __enter__(self) -> None:
+        self._start = time.perf_counter()
+
+    def __exit__(self, *args) -> None:
+        self._recorder(self._name, time.perf_counter() - self._start)
+
+
+def phase(name: str) -> typing.ContextManager[None]:
+    """
+    This function returns a context manager that reports the duration of the enclosed block as the given phase. It
+    does nothing if no instrumentation is installed.
+    """  # NOQA
+    recorder = _recorder
+    if recorder is None:
+        return _NO_PHASE
+    return _Phase(name, recorder)
+
+
+class PhaseMetrics:
+    """
+    This class is a thread-safe registry of the number of runs and the total duration of each phase. Install it with
+    set_instrumentation.
+
+    Example usage:
+
+    >>> metrics = PhaseMetrics()
+    >>> metrics("load", 0.5)
+    >>> metrics("load", 0.25)
+    >>> metrics.snapshot()
+    {'load': (2, 0.75)}
+    >>> print(metrics.to_prometheus(), end="")
+    # HELP arcaflow_kubernetes_phase_seconds Time spent in each phase of the kubeconfig conversion and connection.
+    # TYPE arcaflow_kubernetes_phase_seconds summary
+    arcaflow_kubernetes_phase_seconds_count{phase="load"} 2
+    arcaflow_kubernetes_phase_seconds_sum{phase="load"} 0.75
+    """  # NOQA
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._phases: typing.Dict[str, typing.List] = {}
+
+    def __call__(self, name: str, seconds: float) -> None:
+        with self._lock:
+            entry = self._phases.get(name)
+            if entry is None:
+                self._phases[name] = [1, seconds]
+            else:
+                entry[0] += 1
+                entry[1] += seconds
+
+    def snapshot(self) -> typing.Dict[str, typing.Tuple[int, float]]:
+        """
+        This function returns the number of runs and the total duration in seconds of each phase.
+        """  # NOQA
+        with self._lock:
+            return {
+                name: (count, seconds)
+                for name, (count, seconds) in self._phases.items()
+            }
+
+    def reset(self) -> None:
+        """
+        This function discards all recorded phases.
+        """
+        with self._lock:
+            self._phases.clear()
+
+    def to_prometheus(
+        self, metric: str = "arcaflow_kubernetes_phase_seconds"
+    ) -> str:
+        """
+        This function renders the recorded phases in the Prometheus text exposition format.
+
+        :param metric: The name of the metric.
+        :return: the metric family as text.
+        """  # NOQA
+        lines = [
+            f"# HELP {metric} Time spent in each phase of the kubeconfig "
+            f"conversion and connection.",
+            f"# TYPE {metric} summary",
+        ]
+        for name, (count, seconds) in sorted(self.snapshot().items()):
+            label = name.replace("\\", "\\\\").replace('"', '\\"')
+            lines.append(f'{metric}_count{{phase="{label}"}} {count}')
+            lines.append(f'{metric}_sum{{phase="{label}"}} {seconds!r}')
+        return "\n".join(lines) + "\n"
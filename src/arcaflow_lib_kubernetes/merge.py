@@ -0,0 +1,117 @@
+import copy
+import os
+import threading
+import typing
+
+from .cache import KubeConfigCache
+from .model import InvalidKubeConfigException, KubeConfig
+
+
+def kubeconfig_paths(
+    kubeconfig_env: typing.Optional[str] = None,
+) -> typing.List[str]:
+    """
+    This function returns the kubeconfig files listed in a KUBECONFIG-style, path separator delimited string. Empty
+    and repeated entries are dropped. If the list is empty, ~/.kube/config is used like kubectl does.
+
+    >>> kubeconfig_paths("/a:/b::/a")
+    ['/a', '/b']
+
+    :param kubeconfig_env: The file list. Defaults to the KUBECONFIG environment variable.
+    :return: the kubeconfig file paths in precedence order.
+    """  # NOQA
+    if kubeconfig_env is None:
+        kubeconfig_env = os.environ.get("KUBECONFIG", "")
+    paths = []
+    for path in kubeconfig_env.split(os.pathsep):
+        if path != "" and path not in paths:
+            paths.append(path)
+    if len(paths) == 0:
+        paths.append(os.path.join(os.path.expanduser("~"), ".kube", "config"))
+    return paths
+
+
+def merge_kubeconfigs(kubeconfigs: typing.Iterable[KubeConfig]) -> KubeConfig:
+    """
+    This function merges kubeconfigs with kubectl semantics: the first cluster, context and user with a given name
+    wins, as do the first non-empty current context and preferences.
+
+    :param kubeconfigs: The kubeconfigs in precedence order.
+    :return: the merged kubeconfig. It shares its entries with the input kubeconfigs.
+    """  # NOQA
+    merged = KubeConfig("Config", "v1", [], [], [])
+    seen = {"clusters": set(), "contexts": set(), "users": set()}
+    for kubeconfig in kubeconfigs:
+        if not merged.current_context:
+            merged.current_context = kubeconfig.current_context
+        if not merged.preferences:
+            merged.preferences = kubeconfig.preferences
+        for section, names in seen.items():
+            for entry in getattr(kubeconfig, section):
+                if entry.name not in names:
+                    names.add(entry.name)
+                    getattr(merged, section).append(entry)
+    return merged
+
+
+class KubeConfigLoader:
+    """
+    This class loads and merges the kubeconfig files listed in KUBECONFIG. Each file is parsed once and kept until
+    its modification time or size changes; the merged kubeconfig is only rebuilt if one of the files changed.
+    Files that do not exist are skipped and relative file paths are resolved against the directory of the file that
+    defines them, like kubectl does.
+    """  # NOQA
+
+    def __init__(self, max_files: int = 256, copy_results: bool = True):
+        """
+        :param max_files: The maximum number of parsed files to keep.
+        :param copy_results: Return deep copies of the merged KubeConfig. Disable only if callers never modify results.
+        """  # NOQA
+        self.copy_results = copy_results
+        self._files = KubeConfigCache(max_files, copy_results=False)
+        self._merged: typing.Optional[
+            typing.Tuple[typing.List[typing.Tuple], KubeConfig]
+        ] = None
+        self._lock = threading.Lock()
+
+    def load(
+        self, paths: typing.Optional[typing.Sequence[str]] = None
+    ) -> KubeConfig:
+        """
+        This function returns the merged kubeconfig of the given files.
+
+        :param paths: The kubeconfig files in precedence order. Defaults to the files listed in KUBECONFIG.
+        :return: the merged kubeconfig.
+        :raises InvalidKubeConfigException: If none of the files exist or one of them is not a valid kubeconfig.
+        """  # NOQA
+        if paths is None:
+            paths = kubeconfig_paths()
+        versions = []
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            except OSError as e:
+                raise InvalidKubeConfigException(
+                    f"The kubeconfig file {path} was not readable: "
+                    f"{e.__str__()}"
+                ) from e
+            versions.append(
+                (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+            )
+        if len(versions) == 0:
+            raise InvalidKubeConfigException(
+                f"None of the kubeconfig files {', '.join(paths)} exist."
+            )
+
+        with self._lock:
+            if self._merged is None or self._merged[0] != versions:
+                merged = merge_kubeconfigs(
+                    self._files.parse_file(path) for path, _, _ in versions
+                )
+                self._merged = (versions, merged)
+            merged = self._merged[1]
+        if self.copy_results:
+            return copy.deepcopy(merged)
+        return merged
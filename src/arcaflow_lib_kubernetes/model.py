@@ -1,12 +1,83 @@
 import abc
 import enum
+import functools
 import typing
 from dataclasses import dataclass
 
 from arcaflow_plugin_sdk import plugin, schema
 
 
-@dataclass
+@dataclass(slots=True)
+class ExecEnvVar:
+    """
+    This class is an environment variable passed to an exec credential plugin.
+    """
+
+    name: typing.Annotated[str, schema.name("Name")]
+    value: typing.Annotated[str, schema.name("Value")]
+
+
+@dataclass(slots=True)
+class ExecConfig:
+    """
+    This class configures an exec credential plugin, a command that prints an ExecCredential with the credentials to
+    use, e.g. for EKS, GKE or OIDC.
+    """  # NOQA
+
+    command: typing.Annotated[
+        str,
+        schema.name("Command"),
+        schema.description("Command to execute to obtain the credentials."),
+    ]
+    api_version: typing.Annotated[
+        str,
+        schema.id("apiVersion"),
+        schema.name("API version"),
+        schema.description(
+            "Version of the ExecCredential API the plugin implements, "
+            "e.g. client.authentication.k8s.io/v1."
+        ),
+    ]
+    args: typing.Annotated[
+        typing.Optional[typing.List[str]],
+        schema.name("Arguments"),
+        schema.description("Arguments to pass to the command."),
+    ] = None
+    env: typing.Annotated[
+        typing.Optional[typing.List[ExecEnvVar]],
+        schema.name("Environment"),
+        schema.description(
+            "Additional environment variables to pass to the command."
+        ),
+    ] = None
+    install_hint: typing.Annotated[
+        typing.Optional[str],
+        schema.id("installHint"),
+        schema.name("Install hint"),
+        schema.description(
+            "Instructions for installing the command, shown if it is missing."
+        ),
+    ] = None
+    provide_cluster_info: typing.Annotated[
+        bool,
+        schema.id("provideClusterInfo"),
+        schema.name("Provide cluster info"),
+        schema.description(
+            "Pass the cluster server and certificate authority to the command."
+        ),
+    ] = False
+    interactive_mode: typing.Annotated[
+        typing.Optional[str],
+        schema.id("interactiveMode"),
+        schema.name("Interactive mode"),
+        schema.description(
+            "Whether the command needs a terminal: Never, IfAvailable or "
+            "Always. Commands are never run interactively."
+        ),
+    ] = None
+
+
+@dataclass(slots=True)
 class ConnectionParameters:
     """
     This is a connection specification matching the Go connection structure.
@@ -96,6 +167,14 @@ class ConnectionParameters:
         ),
     ] = None
 
+    exec: typing.Annotated[
+        typing.Optional[ExecConfig],
+        schema.name("Exec credential plugin"),
+        schema.description(
+            "Command to run to obtain credentials when connecting."
+        ),
+    ] = None
+
     insecure_skip_tls_verify: typing.Annotated[
         bool,
         schema.id("insecure-skip-tls-verify"),
@@ -106,8 +185,57 @@ class ConnectionParameters:
         ),
     ] = False
 
+    pool_maxsize: typing.Annotated[
+        typing.Optional[int],
+        schema.id("poolMaxsize"),
+        schema.name("Connection pool size"),
+        schema.description(
+            "Maximum number of connections kept open to the API server. "
+            "Defaults to 5 per CPU."
+        ),
+        schema.min(1),
+    ] = None
+    connect_timeout: typing.Annotated[
+        typing.Optional[float],
+        schema.id("connectTimeout"),
+        schema.name("Connect timeout"),
+        schema.description(
+            "Seconds to wait for a connection to the API server to be "
+            "established. Defaults to no timeout."
+        ),
+        schema.min(0.0),
+    ] = None
+    read_timeout: typing.Annotated[
+        typing.Optional[float],
+        schema.id("readTimeout"),
+        schema.name("Read timeout"),
+        schema.description(
+            "Seconds to wait for data from the API server. "
+            "Defaults to no timeout."
+        ),
+        schema.min(0.0),
+    ] = None
+    retries: typing.Annotated[
+        typing.Optional[int],
+        schema.name("Retries"),
+        schema.description(
+            "Number of times a failed request is retried. Defaults to 3."
+        ),
+        schema.min(0),
+    ] = None
+    tcp_keepalive: typing.Annotated[
+        typing.Optional[int],
+        schema.id("tcpKeepalive"),
+        schema.name("TCP keep-alive"),
+        schema.description(
+            "Seconds a pooled connection is idle before TCP keep-alive "
+            "probes are sent. Disabled by default."
+        ),
+        schema.min(1),
+    ] = None
 
-@dataclass
+
+@dataclass(slots=True)
 class KubeConfigClusterParams:
     server: typing.Annotated[str, schema.id("server"), schema.name("Server")]
     certificate_authority: typing.Annotated[
@@ -149,13 +277,13 @@ class KubeConfigClusterParams:
     ] = None  # NOQA
 
 
-@dataclass
+@dataclass(slots=True)
 class KubeConfigCluster:
     name: typing.Annotated[str, schema.name("Name")]
     cluster: typing.Annotated[KubeConfigClusterParams, schema.name("cluster")]
 
 
-@dataclass
+@dataclass(slots=True)
 class KubeConfigContextParams:
     cluster: typing.Annotated[str, schema.name("Cluster")]
     user: typing.Annotated[str, schema.name("User")]
@@ -174,13 +302,13 @@ class KubeConfigContextParams:
     ] = None  # NOQA
 
 
-@dataclass
+@dataclass(slots=True)
 class KubeConfigContext:
     name: typing.Annotated[str, schema.name("Name")]
     context: typing.Annotated[KubeConfigContextParams, schema.name("context")]
 
 
-@dataclass
+@dataclass(slots=True)
 class KubeConfigUserParameters:
     username: typing.Annotated[
         typing.Optional[str],
@@ -227,9 +355,16 @@ class KubeConfigUserParameters:
         schema.name("Client key"),
         schema.description("Client key data Base64-encoded in PEM format."),
     ] = None
+    exec: typing.Annotated[
+        typing.Optional[ExecConfig],
+        schema.name("Exec credential plugin"),
+        schema.description(
+            "Command to run to obtain credentials, e.g. for EKS, GKE or OIDC."
+        ),
+    ] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class KubeConfigUser:
     """
     This class represents a user entry in a kubeconfig.
@@ -247,7 +382,7 @@ class KubeConfigKindEnum(enum.Enum):
     Config = "Config"
 
 
-@dataclass
+@dataclass(slots=True)
 class KubeConfig:
     """
     This class represents a full KubeConfig.
@@ -322,5 +457,33 @@ class UnusableKubeConfigException(KubeConfigException):
         return f"Valid but unusable kubeconfig: {self.message}"
 
 
-kubeconfig_schema = plugin.build_object_schema(KubeConfig)
-connection_schema = plugin.build_object_schema(ConnectionParameters)
+@functools.cache
+def _schemas() -> typing.Tuple[schema.ScopeType, schema.ScopeType]:
+    return (
+        plugin.build_object_schema(KubeConfig),
+        plugin.build_object_schema(ConnectionParameters),
+    )
+
+
+def get_kubeconfig_schema() -> schema.ScopeType:
+    """
+    This function returns the schema of KubeConfig. It is built on first use.
+    """
+    return _schemas()[0]
+
+
+def get_connection_schema() -> schema.ScopeType:
+    """
+    This function returns the schema of ConnectionParameters. It is built on first use.
+    """  # NOQA
+    return _schemas()[1]
+
+
+def __getattr__(name: str) -> typing.Any:
+    # kubeconfig_schema and connection_schema used to be built at import
+    # time; they are still available as module attributes.
+    if name == "kubeconfig_schema":
+        return get_kubeconfig_schema()
+    if name == "connection_schema":
+        return get_connection_schema()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,203 @@
+import base64
+import collections
+import threading
+import typing
+
+
+class PEMData(str):
+    """
+    This class is the string form of PEM-encoded credentials in ConnectionParameters. It remembers the base64
+    encoding it was decoded from, which is the string of the kubeconfig itself, so that converting the credentials
+    back into a kubeconfig does not encode them again. The raw bytes are only kept once they are first needed, e.g.
+    by connect(), so that credentials that are never used to connect are not held twice and connecting again does
+    not encode them again. PEM data is UTF-8, of which ASCII is a subset. It compares equal to, and can be used as, a
+    plain string.
+
+    Example usage:
+
+    >>> pem = PEMData.from_base64("LS0tLS1CRUdJTi0tLS0t")
+    >>> pem
+    '-----BEGIN-----'
+    >>> pem.to_bytes()
+    b'-----BEGIN-----'
+    >>> pem.to_base64()
+    'LS0tLS1CRUdJTi0tLS0t'
+    """  # NOQA
+
+    __slots__ = ("_base64", "_bytes")
+
+    @classmethod
+    def from_base64(cls, data: str) -> "PEMData":
+        """
+        This function decodes base64-encoded PEM data, e.g. from a kubeconfig.
+
+        :param data: The base64-encoded data.
+        :return: the decoded PEM data.
+        :raises ValueError: If the data is not valid base64 or UTF-8.
+        """  # NOQA
+        pem = cls(base64.b64decode(data).decode("utf-8"))
+        pem._base64 = data
+        return pem
+
+    @classmethod
+    def from_bytes(cls, raw: bytes) -> "PEMData":
+        """
+        This function wraps raw PEM data, e.g. read from a file.
+
+        :param raw: The PEM data.
+        :return: the PEM data.
+        :raises ValueError: If the data is not valid UTF-8.
+        """  # NOQA
+        return cls(raw.decode("utf-8"))
+
+    def to_bytes(self) -> bytes:
+        """
+        This function returns the raw PEM data.
+        """
+        try:
+            return self._bytes
+        except AttributeError:
+            self._bytes = self.encode("utf-8")
+            return self._bytes
+
+    def to_base64(self) -> str:
+        """
+        This function returns the base64-encoded PEM data, as used in kubeconfig files.
+        """  # NOQA
+        try:
+            return self._base64
+        except AttributeError:
+            self._base64 = base64.b64encode(self.to_bytes()).decode("ascii")
+            return self._base64
+
+
+def pem_bytes(value: str) -> bytes:
+    """
+    This function returns the raw bytes of PEM data held in a ConnectionParameters field.
+    """  # NOQA
+    if isinstance(value, PEMData):
+        return value.to_bytes()
+    return value.encode("utf-8")
+
+
+def pem_base64(value: str) -> str:
+    """
+    This function returns the base64 encoding of PEM data held in a ConnectionParameters field.
+    """  # NOQA
+    if isinstance(value, PEMData):
+        return value.to_base64()
+    return base64.b64encode(value.encode("utf-8")).decode("ascii")
+
+
+class CredentialInterner:
+    """
+    This class deduplicates the credentials of connection parameters by content, so that contexts sharing a
+    certificate authority, client certificate or token hold a single copy of it. PEM data decoded from base64 or read
+    from a file is returned as the PEMData instance already created for the same content. The least recently used
+    payloads are dropped once max_size is reached.
+
+    Example usage:
+
+    >>> interner = CredentialInterner()
+    >>> pem = interner.pem_from_base64("LS0tLS1CRUdJTi0tLS0t")
+    >>> interner.pem_from_base64("LS0tLS1CRUdJTi0tLS0t") is pem
+    True
+    >>> interner.pem_from_bytes(b"-----BEGIN-----") is pem
+    True
+    >>> interner.hits, interner.misses
+    (2, 1)
+    """  # NOQA
+
+    def __init__(self, max_size: int = 1024):
+        """
+        :param max_size: The maximum number of payloads to remember.
+        """
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._payloads: collections.OrderedDict = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def pem_from_base64(self, data: str) -> PEMData:
+        """
+        This function decodes base64-encoded PEM data like PEMData.from_base64, returning the existing instance for
+        the same data. Data that is only seen once is decoded once, as without interning.
+
+        :param data: The base64-encoded data.
+        :return: the decoded PEM data.
+        :raises ValueError: If the data is not valid base64 or UTF-8.
+        """  # NOQA
+        pem = self._get(("base64", data))
+        if pem is None:
+            decoded = PEMData.from_base64(data)
+            pem = self._put(("pem", decoded), decoded)
+            self._put(("base64", data), pem)
+            self._count(pem is not decoded)
+        return pem
+
+    def pem_from_bytes(self, raw: bytes) -> PEMData:
+        """
+        This function wraps raw PEM data like PEMData.from_bytes, returning the existing instance for the same data.
+
+        :param raw: The PEM data.
+        :return: the PEM data.
+        """  # NOQA
+        wrapped = PEMData.from_bytes(raw)
+        pem = self._put(("pem", wrapped), wrapped)
+        self._count(pem is not wrapped)
+        return pem
+
+    def token(self, token: typing.Optional[str]) -> typing.Optional[str]:
+        """
+        This function returns the existing string for a bearer token with the same content.
+        """  # NOQA
+        if token is None:
+            return None
+        interned = self._get(("token", token))
+        if interned is None:
+            interned = self._put(("token", token), token)
+            self._count(interned is not token)
+        return interned
+
+    def clear(self) -> None:
+        """
+        This function forgets all payloads.
+        """
+        with self._lock:
+            self._payloads.clear()
+
+    def __len__(self) -> int:
+        return len(self._payloads)
+
+    def _get(self, key: typing.Tuple) -> typing.Optional[str]:
+        with self._lock:
+            value = self._payloads.get(key)
+            if value is None:
+                return None
+            self._payloads.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def _put(self, key: typing.Tuple, value: str) -> str:
+        """
+        This function remembers value unless a value is already stored for the key, e.g. by another thread, and
+        returns the stored value.
+        """  # NOQA
+        with self._lock:
+            existing = self._payloads.get(key)
+            if existing is not None:
+                self._payloads.move_to_end(key)
+                return existing
+            self._payloads[key] = value
+            while len(self._payloads) > self.max_size:
+                self._payloads.popitem(last=False)
+            return value
+
+    def _count(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
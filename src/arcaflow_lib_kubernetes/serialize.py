@@ -0,0 +1,174 @@
+import enum
+import functools
+import io
+import json
+import os
+import tempfile
+import typing
+
+import yaml
+
+from .model import KubeConfig, get_kubeconfig_schema
+
+try:
+    from yaml import CSafeDumper as _SafeDumper
+except ImportError:
+    from yaml import SafeDumper as _SafeDumper
+
+FORMATS = ("yaml", "json")
+
+
+@functools.cache
+def _document_fields() -> typing.Dict[type, typing.Tuple]:
+    """
+    This function returns the attribute name and document key of every field of the kubeconfig classes, in the
+    order the kubeconfig schema serializes them.
+    """  # NOQA
+    return {
+        object_type.cls: tuple(
+            (prop.field_override or property_id, property_id)
+            for property_id, prop in object_type.properties.items()
+        )
+        for object_type in get_kubeconfig_schema().objects.values()
+    }
+
+
+def _check_format(format: str) -> None:
+    if format not in FORMATS:
+        raise ValueError(
+            f"Unsupported kubeconfig format {format!r}, "
+            f"expected one of {', '.join(FORMATS)}"
+        )
+
+
+def _to_document(value: typing.Any, fields: typing.Dict) -> typing.Any:
+    value_type = type(value)
+    object_fields = fields.get(value_type)
+    if object_fields is not None:
+        document = {}
+        for attribute, key in object_fields:
+            field_value = getattr(value, attribute)
+            if field_value is not None:
+                document[key] = _to_document(field_value, fields)
+        return document
+    if value_type is list:
+        return [_to_document(item, fields) for item in value]
+    if value_type is str or value_type is bool:
+        return value
+    if isinstance(value, str):
+        # Subclasses such as PEMData are not accepted by the safe dumper.
+        return str(value)
+    if isinstance(value, enum.Enum):
+        return value.value
+    return value
+
+
+def kubeconfig_to_document(
+    kubeconfig: KubeConfig,
+) -> typing.Dict[str, typing.Any]:
+    """
+    This function converts a KubeConfig structure into the dict the kubeconfig schema serializes it to, without
+    validating it again. Use get_kubeconfig_schema().serialize() for KubeConfig structures that were not created by
+    parse_kubeconfig or connection_to_kubeconfig and may be invalid.
+
+    Example usage:
+
+    >>> from .convert import parse_kubeconfig, test_kubeconfig
+    >>> kubeconfig = parse_kubeconfig(test_kubeconfig())
+    >>> document = kubeconfig_to_document(kubeconfig)
+    >>> document == get_kubeconfig_schema().serialize(kubeconfig)
+    True
+
+    :param kubeconfig: The KubeConfig data structure.
+    :return: the kubeconfig document.
+    """  # NOQA
+    return _to_document(kubeconfig, _document_fields())
+
+
+def dump_kubeconfig(
+    kubeconfig: KubeConfig,
+    stream: typing.TextIO,
+    format: str = "yaml",
+) -> None:
+    """
+    This function writes a KubeConfig structure to a text stream as a kubeconfig file. YAML is emitted with the
+    libyaml-based dumper if PyYAML was built with it, JSON is emitted without whitespace.
+
+    :param kubeconfig: The KubeConfig data structure.
+    :param stream: The stream to write to.
+    :param format: "yaml" or "json".
+    :raises ValueError: If the format is not supported.
+    """  # NOQA
+    _check_format(format)
+    document = kubeconfig_to_document(kubeconfig)
+    if format == "yaml":
+        yaml.dump(
+            document,
+            stream,
+            Dumper=_SafeDumper,
+            default_flow_style=False,
+            sort_keys=False,
+        )
+    else:
+        # json.dump encodes in Python, json.dumps in C.
+        stream.write(json.dumps(document, separators=(",", ":")))
+        stream.write("\n")
+
+
+def serialize_kubeconfig(kubeconfig: KubeConfig, format: str = "yaml") -> str:
+    """
+    This function serializes a KubeConfig structure into a kubeconfig file, the reverse of parse_kubeconfig.
+
+    Example usage:
+
+    >>> from .convert import parse_kubeconfig, test_kubeconfig
+    >>> kubeconfig = parse_kubeconfig(test_kubeconfig())
+    >>> parse_kubeconfig(serialize_kubeconfig(kubeconfig)) == kubeconfig
+    True
+    >>> parse_kubeconfig(serialize_kubeconfig(kubeconfig, "json")) == kubeconfig
+    True
+
+    :param kubeconfig: The KubeConfig data structure.
+    :param format: "yaml" or "json".
+    :return: the kubeconfig file contents.
+    :raises ValueError: If the format is not supported.
+    """  # NOQA
+    stream = io.StringIO()
+    dump_kubeconfig(kubeconfig, stream, format)
+    return stream.getvalue()
+
+
+def write_kubeconfig(
+    kubeconfig: KubeConfig,
+    path: str,
+    format: str = "yaml",
+    mode: int = 0o600,
+) -> None:
+    """
+    This function writes a KubeConfig structure to a kubeconfig file. The file is written to a temporary file in the
+    same directory first and then renamed over the target, so readers never see a partially written kubeconfig.
+
+    :param kubeconfig: The KubeConfig data structure.
+    :param path: The file to write.
+    :param format: "yaml" or "json".
+    :param mode: The permissions of the file. Defaults to owner read and write only, since kubeconfigs hold
+    credentials.
+    :raises ValueError: If the format is not supported.
+    :raises OSError: If the file cannot be written.
+    """  # NOQA
+    _check_format(format)
+    directory, name = os.path.split(os.path.abspath(path))
+    fd, temporary_path = tempfile.mkstemp(prefix=f".{name}.", dir=directory)
+    try:
+        with os.fdopen(fd, "w") as f:
+            os.fchmod(f.fileno(), mode)
+            dump_kubeconfig(kubeconfig, f, format)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary_path, path)
+    except BaseException:
+        try:
+            os.unlink(temporary_path)
+        except OSError:
+            pass
+        raise
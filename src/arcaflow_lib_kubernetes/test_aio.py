@@ -0,0 +1,79 @@
+import doctest
+import threading
+import time
+import unittest
+from unittest import mock
+
+from . import aio, convert
+from .model import InvalidKubeConfigException
+from .test_convert import TestFixtures
+
+
+class TestAsyncConverter(unittest.IsolatedAsyncioTestCase):
+    fixtures = TestFixtures()
+
+    async def test_convert(self):
+        converter = aio.AsyncConverter()
+        kubeconfig = await converter.parse_kubeconfig(
+            self.fixtures.kubeconfigNoData
+        )
+        self.assertEqual(
+            kubeconfig,
+            convert.parse_kubeconfig(self.fixtures.kubeconfigNoData),
+        )
+        connection = await converter.kubeconfig_to_connection(kubeconfig)
+        self.assertEqual(connection.key, self.fixtures.clientKey)
+        api_client = await converter.connect(connection)
+        try:
+            self.assertEqual(api_client.configuration.host, connection.host)
+        finally:
+            api_client.close()
+
+    async def test_kubeconfigs_to_connections(self):
+        converter = aio.AsyncConverter()
+        results = await converter.kubeconfigs_to_connections(
+            [
+                self.fixtures.kubeconfig,
+                self.fixtures.kubeconfigNoHost,
+                self.fixtures.kubeconfigNoData,
+            ]
+        )
+        self.assertEqual(len(results), 3)
+        self.assertEqual(results[0].host, "https://127.0.0.1:6443")
+        self.assertIsInstance(results[1], InvalidKubeConfigException)
+        self.assertEqual(results[2].cacert, self.fixtures.caCrt)
+
+    async def test_max_concurrency(self):
+        lock = threading.Lock()
+        running = 0
+        peak = 0
+
+        def parse_kubeconfig(data):
+            nonlocal running, peak
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            time.sleep(0.01)
+            with lock:
+                running -= 1
+            return convert.parse_kubeconfig(data)
+
+        converter = aio.AsyncConverter(max_concurrency=2)
+        with mock.patch.object(aio, "parse_kubeconfig", parse_kubeconfig):
+            results = await converter.kubeconfigs_to_connections(
+                [self.fixtures.kubeconfig] * 8
+            )
+        self.assertEqual(len(results), 8)
+        self.assertEqual(peak, 2)
+
+
+def load_tests(loader, tests, ignore):
+    """
+    This function adds the doctests to the discovery process.
+    """
+    tests.addTests(doctest.DocTestSuite(aio))
+    return tests
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,196 @@
+import http.server
+import json
+import os
+import socket
+import ssl
+import threading
+import time
+import unittest
+
+import urllib3
+
+from . import convert, model
+
+TEST_DATA = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "../testdata"
+)
+VERSION = {
+    "buildDate": "",
+    "compiler": "gc",
+    "gitCommit": "",
+    "gitTreeState": "clean",
+    "gitVersion": "v1.30.0",
+    "goVersion": "go1.22",
+    "major": "1",
+    "minor": "30",
+    "platform": "linux/amd64",
+}
+
+
+class StubHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.server.authorizations.append(self.headers.get("Authorization"))
+        if self.path == "/slow":
+            time.sleep(2)
+        body = json.dumps(VERSION).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class StubServer(http.server.ThreadingHTTPServer):
+    """
+    This class is an HTTPS server that counts the TLS connections it accepted.
+    """
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(
+            os.path.join(TEST_DATA, "server.crt"),
+            os.path.join(TEST_DATA, "server.key"),
+        )
+        self.socket = context.wrap_socket(self.socket, server_side=True)
+        self.accepted = 0
+        self.authorizations = []
+
+    def get_request(self):
+        request = super().get_request()
+        self.accepted += 1
+        return request
+
+
+class TestCredentialApiClient(unittest.TestCase):
+    def setUp(self):
+        self.server = StubServer()
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.start()
+        self.addCleanup(thread.join)
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        with open(os.path.join(TEST_DATA, "server.crt")) as f:
+            self.cacert = f.read()
+
+    def connection(self, **kwargs) -> model.ConnectionParameters:
+        connection = model.ConnectionParameters(
+            f"https://127.0.0.1:{self.server.server_address[1]}",
+            cacert=self.cacert,
+            **kwargs,
+        )
+        model.get_connection_schema().validate(connection)
+        return connection
+
+    def wait_for_accepted(self, count: int):
+        deadline = time.monotonic() + 5
+        while self.server.accepted < count:
+            self.assertLess(time.monotonic(), deadline)
+            time.sleep(0.01)
+
+    def get(self, api_client, path: str = "/version"):
+        return api_client.call_api(
+            path,
+            "GET",
+            auth_settings=["BearerToken"],
+            response_type="object",
+            _return_http_data_only=True,
+        )
+
+    def test_warm_up(self):
+        api_client = convert.connect(
+            self.connection(pool_maxsize=8), warm_up=4
+        )
+        self.addCleanup(api_client.close)
+        self.wait_for_accepted(4)
+        pool = api_client.rest_client.pool_manager.connection_from_url(
+            api_client.configuration.host
+        )
+        self.assertEqual(pool.pool.maxsize, 8)
+        self.assertEqual(pool.num_connections, 4)
+
+        for _ in range(4):
+            self.assertEqual(self.get(api_client), VERSION)
+        self.assertEqual(self.server.accepted, 4)
+        self.assertEqual(pool.num_connections, 4)
+
+    def test_warm_up_limited_to_pool_size(self):
+        api_client = convert.connect(self.connection(pool_maxsize=2))
+        self.addCleanup(api_client.close)
+        self.assertEqual(api_client.warm_up(5), 2)
+        self.assertEqual(api_client.warm_up(2), 2)
+        self.wait_for_accepted(2)
+        self.assertEqual(self.server.accepted, 2)
+
+    def test_warm_up_failure(self):
+        connection = self.connection()
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            connection.host = f"https://127.0.0.1:{s.getsockname()[1]}"
+        api_client = convert.connect(connection)
+        self.addCleanup(api_client.close)
+        with self.assertLogs(level="WARNING"):
+            self.assertEqual(api_client.warm_up(2), 0)
+
+    def test_read_timeout(self):
+        api_client = convert.connect(
+            self.connection(read_timeout=0.2, connect_timeout=1.0, retries=0)
+        )
+        self.addCleanup(api_client.close)
+        start = time.monotonic()
+        with self.assertRaises(urllib3.exceptions.HTTPError):
+            self.get(api_client, "/slow")
+        self.assertLess(time.monotonic() - start, 1.5)
+
+    def test_tcp_keepalive(self):
+        api_client = convert.connect(self.connection(tcp_keepalive=30))
+        self.addCleanup(api_client.close)
+        self.assertEqual(api_client.warm_up(1), 1)
+        pool = api_client.rest_client.pool_manager.connection_from_url(
+            api_client.configuration.host
+        )
+        sock = pool._get_conn().sock
+        self.assertNotEqual(
+            sock.getsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE), 0
+        )
+        if hasattr(socket, "TCP_KEEPIDLE"):
+            self.assertEqual(
+                sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE), 30
+            )
+
+    def test_update_connection_during_request(self):
+        other_server = StubServer()
+        thread = threading.Thread(target=other_server.serve_forever)
+        thread.start()
+        self.addCleanup(thread.join)
+        self.addCleanup(other_server.server_close)
+        self.addCleanup(other_server.shutdown)
+        api_client = convert.connect(self.connection(bearer_token="old"))
+        self.addCleanup(api_client.close)
+        other_connection = self.connection(bearer_token="new")
+        other_connection.host = (
+            f"https://127.0.0.1:{other_server.server_address[1]}"
+        )
+
+        def update_during_request(configuration):
+            # Runs after the request read the credentials and before it
+            # builds its URL.
+            configuration.refresh_api_key_hook = None
+            api_client.update_connection(other_connection)
+
+        api_client.configuration.refresh_api_key_hook = update_during_request
+        self.assertEqual(self.get(api_client), VERSION)
+        self.assertEqual(self.get(api_client), VERSION)
+        self.assertEqual(self.server.authorizations, ["Bearer old"])
+        self.assertEqual(other_server.authorizations, ["Bearer new"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from . import bulk, convert, model
+
+
+class TestBulk(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write(self, name: str, data: str) -> str:
+        path = os.path.join(self.directory.name, name)
+        with open(path, "w") as f:
+            f.write(data)
+        return path
+
+    def test_directory(self):
+        valid = [
+            self.write(f"cluster-{i}.yaml", convert.test_kubeconfig())
+            for i in range(20)
+        ]
+        invalid = self.write("invalid.yaml", "clusters: [")
+        self.write(".hidden", "clusters: [")
+        os.mkdir(os.path.join(self.directory.name, "subdirectory"))
+
+        results = dict(
+            bulk.load_kubeconfig_directory(
+                self.directory.name, max_workers=2, chunk_size=3
+            )
+        )
+        self.assertEqual(set(results), set(valid + [invalid]))
+        expected = convert.kubeconfig_to_connection(
+            convert.parse_kubeconfig(convert.test_kubeconfig())
+        )
+        for path in valid:
+            self.assertEqual(results[path], expected)
+        self.assertIsInstance(
+            results[invalid], model.InvalidKubeConfigException
+        )
+
+    def test_errors(self):
+        missing = os.path.join(self.directory.name, "missing.yaml")
+        no_context = self.write(
+            "no-context.yaml",
+            convert.test_kubeconfig().replace(
+                "current-context: default", "current-context: ''"
+            ),
+        )
+        results = dict(
+            bulk.load_kubeconfigs([missing, no_context], max_workers=1)
+        )
+        self.assertIsInstance(
+            results[missing], model.InvalidKubeConfigException
+        )
+        self.assertIn("missing.yaml", results[missing].message)
+        self.assertIsInstance(
+            results[no_context], model.UnusableKubeConfigException
+        )
+
+    def test_not_utf8(self):
+        valid = self.write("valid.yaml", convert.test_kubeconfig())
+        binary = os.path.join(self.directory.name, "binary")
+        with open(binary, "wb") as f:
+            f.write(bytes(range(128, 256)) * 4)
+        results = dict(
+            bulk.load_kubeconfig_directory(self.directory.name, max_workers=1)
+        )
+        self.assertEqual(set(results), {valid, binary})
+        self.assertIsInstance(results[valid], model.ConnectionParameters)
+        self.assertIsInstance(
+            results[binary], model.InvalidKubeConfigException
+        )
+        self.assertIn("UTF-8", results[binary].message)
+
+    def test_unexpected_error(self):
+        path = self.write("valid.yaml", convert.test_kubeconfig())
+        with mock.patch.object(
+            bulk, "parse_kubeconfig", side_effect=RecursionError("too deep")
+        ):
+            result = bulk._load_file(path, True, None)
+        self.assertEqual(result[0], path)
+        self.assertIsInstance(result[1], model.InvalidKubeConfigException)
+        self.assertIn("too deep", result[1].message)
+
+    def test_bounded_in_flight(self):
+        path = self.write("cluster.yaml", convert.test_kubeconfig())
+        consumed = []
+
+        def paths():
+            for i in range(50):
+                consumed.append(i)
+                yield path
+
+        results = bulk.load_kubeconfigs(
+            paths(), max_workers=2, max_in_flight=2, chunk_size=1
+        )
+        next(results)
+        self.assertLessEqual(len(consumed), 3)
+        results.close()
+        self.assertLess(len(consumed), 50)
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            next(bulk.load_kubeconfigs([], chunk_size=0))
+        with self.assertRaises(ValueError):
+            next(bulk.load_kubeconfigs([], max_in_flight=0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,257 @@
+import collections
+import concurrent.futures
+import dataclasses
+import doctest
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from . import cache, convert
+
+
+class FakeClock:
+    now: float
+
+    def __init__(self, now: float = 0.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestConnectionCache(unittest.TestCase):
+    connection = convert.kubeconfig_to_connection(
+        convert.parse_kubeconfig(convert.test_kubeconfig())
+    )
+
+    def test_fingerprint(self):
+        same = dataclasses.replace(self.connection)
+        other = dataclasses.replace(self.connection, bearer_token="other")
+        self.assertEqual(
+            cache.connection_fingerprint(self.connection),
+            cache.connection_fingerprint(same),
+        )
+        self.assertNotEqual(
+            cache.connection_fingerprint(self.connection),
+            cache.connection_fingerprint(other),
+        )
+
+    def test_reuse(self):
+        connection_cache = cache.ConnectionCache()
+        api_client = connection_cache.connect(self.connection)
+        self.assertIs(
+            api_client,
+            connection_cache.connect(dataclasses.replace(self.connection)),
+        )
+        self.assertIsNot(
+            api_client,
+            connection_cache.connect(
+                dataclasses.replace(self.connection, bearer_token="other")
+            ),
+        )
+        self.assertEqual(len(connection_cache), 2)
+
+    def test_lru_eviction(self):
+        connection_cache = cache.ConnectionCache(max_size=2)
+        first = connection_cache.connect(self.connection)
+        connection_cache.connect(
+            dataclasses.replace(self.connection, bearer_token="a")
+        )
+        connection_cache.connect(self.connection)
+        connection_cache.connect(
+            dataclasses.replace(self.connection, bearer_token="b")
+        )
+        self.assertEqual(len(connection_cache), 2)
+        self.assertIs(first, connection_cache.connect(self.connection))
+
+    def test_ttl_eviction(self):
+        clock = FakeClock()
+        connection_cache = cache.ConnectionCache(ttl=10, clock=clock)
+        first = connection_cache.connect(self.connection)
+        clock.now = 9
+        self.assertIs(first, connection_cache.connect(self.connection))
+        clock.now = 10
+        self.assertIsNot(first, connection_cache.connect(self.connection))
+
+    def test_invalidate(self):
+        connection_cache = cache.ConnectionCache()
+        first = connection_cache.connect(self.connection)
+        self.assertTrue(connection_cache.invalidate(self.connection))
+        self.assertFalse(connection_cache.invalidate(self.connection))
+        self.assertIsNot(first, connection_cache.connect(self.connection))
+        connection_cache.clear()
+        self.assertEqual(len(connection_cache), 0)
+
+    def concurrent_connect(self, connection_cache, connections, threads):
+        """
+        This function calls connect from many threads at the same moment, each picking a connection in turn, and
+        returns the clients and the number of clients built per connection.
+        """  # NOQA
+        builds = collections.Counter()
+        builds_lock = threading.Lock()
+        barrier = threading.Barrier(threads)
+
+        def slow_connect(connection):
+            with builds_lock:
+                builds[connection.bearer_token] += 1
+            time.sleep(0.05)
+            return convert.connect(connection)
+
+        def connect(i):
+            barrier.wait()
+            return connection_cache.connect(connections[i % len(connections)])
+
+        with mock.patch.object(cache, "connect", slow_connect):
+            with concurrent.futures.ThreadPoolExecutor(threads) as executor:
+                api_clients = list(executor.map(connect, range(threads)))
+        return api_clients, builds
+
+    def test_single_flight(self):
+        connection_cache = cache.ConnectionCache()
+        connections = [
+            dataclasses.replace(self.connection, bearer_token=f"token-{i}")
+            for i in range(4)
+        ]
+        api_clients, builds = self.concurrent_connect(
+            connection_cache, connections, 64
+        )
+        self.assertEqual(
+            builds, {connection.bearer_token: 1 for connection in connections}
+        )
+        for i, api_client in enumerate(api_clients):
+            self.assertIs(api_client, api_clients[i % len(connections)])
+            self.assertIs(
+                api_client,
+                connection_cache.connect(connections[i % len(connections)]),
+            )
+        self.assertEqual(len(set(map(id, api_clients))), len(connections))
+        self.assertEqual(len(connection_cache), len(connections))
+
+    def test_single_flight_failure(self):
+        connection_cache = cache.ConnectionCache()
+        connection = dataclasses.replace(self.connection, bearer_token="bad")
+        calls = []
+
+        def failing_connect(connection):
+            calls.append(connection)
+            time.sleep(0.05)
+            raise cache.InvalidKubeConfigException("failed")
+
+        barrier = threading.Barrier(16)
+
+        def connect(_):
+            barrier.wait()
+            try:
+                connection_cache.connect(connection)
+            except cache.InvalidKubeConfigException as e:
+                return e
+            return None
+
+        with mock.patch.object(cache, "connect", failing_connect):
+            with concurrent.futures.ThreadPoolExecutor(16) as executor:
+                errors = list(executor.map(connect, range(16)))
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(error is errors[0] for error in errors))
+        self.assertIsNotNone(errors[0])
+        self.assertEqual(len(connection_cache), 0)
+        # The failure is not cached.
+        self.assertIsNotNone(connection_cache.connect(connection))
+
+    def test_invalidate_during_construction(self):
+        connection_cache = cache.ConnectionCache()
+        started = threading.Event()
+        proceed = threading.Event()
+
+        def blocking_connect(connection):
+            started.set()
+            proceed.wait(5)
+            return convert.connect(connection)
+
+        with mock.patch.object(cache, "connect", blocking_connect):
+            with concurrent.futures.ThreadPoolExecutor(1) as executor:
+                future = executor.submit(
+                    connection_cache.connect, self.connection
+                )
+                self.assertTrue(started.wait(5))
+                self.assertFalse(connection_cache.invalidate(self.connection))
+                proceed.set()
+                api_client = future.result()
+        self.assertIsNotNone(api_client)
+        self.assertEqual(len(connection_cache), 0)
+
+
+class TestKubeConfigCache(unittest.TestCase):
+    def test_parse(self):
+        kubeconfig_cache = cache.KubeConfigCache()
+        first = kubeconfig_cache.parse(convert.test_kubeconfig())
+        first.current_context = "changed"
+        second = kubeconfig_cache.parse(convert.test_kubeconfig())
+        self.assertEqual(second.current_context, "default")
+        self.assertEqual(
+            second, convert.parse_kubeconfig(convert.test_kubeconfig())
+        )
+        self.assertEqual(
+            (kubeconfig_cache.hits, kubeconfig_cache.misses), (1, 1)
+        )
+
+    def test_parse_uncopied(self):
+        kubeconfig_cache = cache.KubeConfigCache(copy_results=False)
+        self.assertIs(
+            kubeconfig_cache.parse(convert.test_kubeconfig()),
+            kubeconfig_cache.parse(convert.test_kubeconfig()),
+        )
+
+    def test_parse_bounded(self):
+        kubeconfig_cache = cache.KubeConfigCache(max_size=1)
+        other = convert.test_kubeconfig().replace(
+            "testpassword", "otherpassword"
+        )
+        kubeconfig_cache.parse(convert.test_kubeconfig())
+        kubeconfig_cache.parse(other)
+        kubeconfig_cache.parse(convert.test_kubeconfig())
+        self.assertEqual(
+            (kubeconfig_cache.hits, kubeconfig_cache.misses), (0, 3)
+        )
+
+    def test_parse_file(self):
+        kubeconfig_cache = cache.KubeConfigCache()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "kubeconfig")
+            with open(path, "w") as f:
+                f.write(convert.test_kubeconfig())
+            kubeconfig_cache.parse_file(path)
+            kubeconfig_cache.parse_file(path)
+            self.assertEqual(
+                (kubeconfig_cache.hits, kubeconfig_cache.misses), (1, 1)
+            )
+
+            with open(path, "w") as f:
+                f.write(
+                    convert.test_kubeconfig().replace(
+                        "current-context: default", "current-context: other"
+                    )
+                )
+            os.utime(path, ns=(0, 0))
+            kubeconfig = kubeconfig_cache.parse_file(path)
+            self.assertEqual(kubeconfig.current_context, "other")
+            self.assertEqual(
+                (kubeconfig_cache.hits, kubeconfig_cache.misses), (1, 2)
+            )
+
+            with self.assertRaises(cache.InvalidKubeConfigException):
+                kubeconfig_cache.parse_file(os.path.join(directory, "missing"))
+
+
+def load_tests(loader, tests, ignore):
+    """
+    This function adds the doctests to the discovery process.
+    """
+    tests.addTests(doctest.DocTestSuite(cache))
+    return tests
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,9 +1,19 @@
+import dataclasses
 import doctest
+import json
 import os
 import unittest
+from unittest import mock
+
+import yaml
 
 from . import convert
-from .model import InvalidKubeConfigException, UnusableKubeConfigException
+from .model import (
+    InvalidKubeConfigException,
+    KubeConfigContext,
+    KubeConfigContextParams,
+    UnusableKubeConfigException,
+)
 
 
 class TestFixtures:
@@ -94,6 +104,23 @@ class TestConvert(unittest.TestCase):
         except Exception as e:
             self.fail(f"Parse raised exception : {e}")
 
+    def test_parse_kubeconfig_loaders(self):
+        for data in (
+            self.fixtures.kubeconfig,
+            self.fixtures.kubeconfigNoData,
+            self.fixtures.kubeconfigExtensions,
+        ):
+            document = yaml.load(data, Loader=yaml.SafeLoader)
+            self.assertEqual(convert._load_document(data), document)
+            self.assertEqual(
+                convert.parse_kubeconfig(json.dumps(document)),
+                convert.parse_kubeconfig(data),
+            )
+        # YAML flow mappings look like JSON but must still be loaded
+        self.assertEqual(
+            convert._load_document("{kind: Config}"), {"kind": "Config"}
+        )
+
     def test_kubeconfig_to_connection(self):
         kubeconfig = convert.parse_kubeconfig(self.fixtures.kubeconfigNoData)
         kubeconfig_nocontext = convert.parse_kubeconfig(
@@ -127,6 +154,40 @@ class TestConvert(unittest.TestCase):
         except Exception as e:
             self.fail(f"kubeconfig_to_connection exception : {e}")
 
+    def test_kubeconfig_to_connections(self):
+        kubeconfig = convert.parse_kubeconfig(self.fixtures.kubeconfigNoData)
+        # The second context has its own cluster and user, which reference
+        # the same certificate authority, certificate and key files.
+        kubeconfig.clusters.append(
+            dataclasses.replace(kubeconfig.clusters[0], name="other")
+        )
+        kubeconfig.users.append(
+            dataclasses.replace(kubeconfig.users[0], name="otheruser")
+        )
+        kubeconfig.contexts.append(
+            KubeConfigContext(
+                "second", KubeConfigContextParams("other", "otheruser")
+            )
+        )
+        kubeconfig.contexts.append(
+            KubeConfigContext(
+                "broken", KubeConfigContextParams("default", "missing")
+            )
+        )
+        with mock.patch.object(
+            convert, "_read_file", wraps=convert._read_file
+        ) as read_file:
+            connections, errors = convert.kubeconfig_to_connections(kubeconfig)
+            self.assertEqual(read_file.call_count, 3)
+        self.assertEqual(list(connections), ["default", "second"])
+        self.assertEqual(
+            connections["second"],
+            convert.kubeconfig_to_connection(kubeconfig, context="second"),
+        )
+        self.assertEqual(connections["second"].key, self.fixtures.clientKey)
+        self.assertEqual(list(errors), ["broken"])
+        self.assertIsInstance(errors["broken"], InvalidKubeConfigException)
+
     def test_connection_to_kubeconfig(self):
         try:
             # test without file inlining
@@ -0,0 +1,67 @@
+import doctest
+import os
+import ssl
+import tempfile
+import unittest
+from unittest import mock
+
+from . import convert, credentials
+from .test_convert import TestFixtures
+
+
+class TestCredentialStore(unittest.TestCase):
+    fixtures = TestFixtures()
+
+    def connection(self):
+        kubeconfig = convert.parse_kubeconfig(self.fixtures.kubeconfigNoData)
+        return convert.kubeconfig_to_connection(kubeconfig, True)
+
+    def test_connect_writes_once(self):
+        with tempfile.TemporaryDirectory() as directory:
+            store = credentials.CredentialStore(directory)
+            with mock.patch.object(
+                store, "_write", wraps=store._write
+            ) as write:
+                first = convert.connect(self.connection(), store)
+                second = convert.connect(self.connection(), store)
+                self.assertEqual(write.call_count, 3)
+            self.assertEqual(
+                first.configuration.cert_file,
+                second.configuration.cert_file,
+            )
+            self.assertEqual(len(os.listdir(directory)), 3)
+            with open(first.configuration.key_file) as f:
+                self.assertEqual(f.read(), self.fixtures.clientKey)
+
+            first.close()
+            self.assertEqual(len(os.listdir(directory)), 3)
+            second.close()
+            self.assertEqual(os.listdir(directory), [])
+            self.assertEqual(len(store), 0)
+
+    def test_release_on_garbage_collection(self):
+        store = credentials.CredentialStore()
+        api_client = convert.connect(self.connection(), store)
+        self.assertEqual(len(store), 3)
+        del api_client
+        self.assertEqual(len(store), 0)
+
+    def test_memfd_loadable(self):
+        store = credentials.CredentialStore()
+        path = store.acquire(self.fixtures.caCrt.encode("ascii"))
+        try:
+            ssl.create_default_context(cafile=path)
+        finally:
+            store.release(path)
+
+
+def load_tests(loader, tests, ignore):
+    """
+    This function adds the doctests to the discovery process.
+    """
+    tests.addTests(doctest.DocTestSuite(credentials))
+    return tests
+
+
+if __name__ == "__main__":
+    unittest.main()
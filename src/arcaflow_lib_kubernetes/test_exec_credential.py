@@ -0,0 +1,268 @@
+import doctest
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from . import convert, exec_credential, model
+from .test_api_client import TEST_DATA, VERSION, StubServer
+from .test_cache import FakeClock
+
+STUB_PLUGIN = """#!{python}
+import datetime, json, os, sys, time
+
+counter = os.environ["STUB_COUNTER"]
+with open(counter, "a") as f:
+    f.write("x")
+with open(counter) as f:
+    runs = len(f.read())
+time.sleep(float(os.environ.get("STUB_DELAY", "0")))
+if os.environ.get("STUB_FAIL"):
+    print("stub failure", file=sys.stderr)
+    sys.exit(1)
+info = json.loads(os.environ["KUBERNETES_EXEC_INFO"])
+status = {{"token": f"token-{{runs}}"}}
+if os.environ.get("STUB_CERT"):
+    del status["token"]
+    for field, name in (
+        ("clientCertificateData", "STUB_CERT"),
+        ("clientKeyData", "STUB_KEY"),
+    ):
+        with open(os.environ[name]) as f:
+            status[field] = f.read()
+expiration = os.environ.get("STUB_EXPIRATION")
+if expiration:
+    status["expirationTimestamp"] = datetime.datetime.fromtimestamp(
+        float(expiration)
+        + float(os.environ.get("STUB_EXPIRATION_STEP", "0")) * (runs - 1),
+        datetime.timezone.utc,
+    ).isoformat().replace("+00:00", "Z")
+print(json.dumps({{
+    "apiVersion": info["apiVersion"],
+    "kind": "ExecCredential",
+    "status": status,
+}}))
+"""
+
+
+class TestExecCredential(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.counter = os.path.join(directory.name, "counter")
+        self.plugin = os.path.join(directory.name, "plugin")
+        with open(self.plugin, "w") as f:
+            f.write(STUB_PLUGIN.format(python=sys.executable))
+        os.chmod(self.plugin, 0o700)
+
+    def exec_config(self, **env: str) -> model.ExecConfig:
+        env["STUB_COUNTER"] = self.counter
+        return model.ExecConfig(
+            self.plugin,
+            "client.authentication.k8s.io/v1",
+            env=[model.ExecEnvVar(name, value) for name, value in env.items()],
+        )
+
+    def runs(self) -> int:
+        if not os.path.exists(self.counter):
+            return 0
+        with open(self.counter) as f:
+            return len(f.read())
+
+    def test_cached_until_expiration(self):
+        clock = FakeClock(1000000.0)
+        cache = exec_credential.ExecCredentialCache(
+            refresh_margin=10, clock=clock
+        )
+        exec_config = self.exec_config(STUB_EXPIRATION=str(clock.now + 100))
+        first = cache.get(exec_config)
+        self.assertEqual(first.token, "token-1")
+        self.assertEqual(first.expiration_timestamp, clock.now + 100)
+        self.assertIs(cache.get(exec_config), first)
+        clock.now += 89
+        self.assertIs(cache.get(exec_config), first)
+        clock.now += 1
+        self.assertEqual(cache.get(exec_config).token, "token-2")
+        self.assertEqual(self.runs(), 2)
+
+    def test_no_expiration(self):
+        cache = exec_credential.ExecCredentialCache()
+        exec_config = self.exec_config()
+        self.assertEqual(cache.get(exec_config).token, "token-1")
+        self.assertEqual(cache.get(exec_config).token, "token-1")
+        self.assertTrue(cache.invalidate(exec_config))
+        self.assertEqual(cache.get(exec_config).token, "token-2")
+
+    def test_single_flight(self):
+        cache = exec_credential.ExecCredentialCache()
+        exec_config = self.exec_config(STUB_DELAY="0.5")
+        barrier = threading.Barrier(8)
+        results = []
+
+        def get():
+            barrier.wait()
+            results.append(cache.get(exec_config))
+
+        threads = [threading.Thread(target=get) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.runs(), 1)
+        self.assertEqual(
+            {credential.token for credential in results}, {"token-1"}
+        )
+
+    def test_failure(self):
+        cache = exec_credential.ExecCredentialCache()
+        exec_config = self.exec_config(STUB_FAIL="1")
+        for _ in range(2):
+            with self.assertRaises(model.InvalidConnectionException) as e:
+                cache.get(exec_config)
+            self.assertIn("stub failure", e.exception.message)
+        self.assertEqual(self.runs(), 2)
+
+        missing = model.ExecConfig(
+            os.path.join(os.path.dirname(self.plugin), "missing"),
+            "client.authentication.k8s.io/v1",
+            install_hint="Install the plugin.",
+        )
+        with self.assertRaises(model.InvalidConnectionException) as e:
+            cache.get(missing)
+        self.assertIn("Install the plugin.", e.exception.message)
+
+        unsupported = self.exec_config()
+        unsupported.api_version = "client.authentication.k8s.io/v1alpha1"
+        with self.assertRaises(model.InvalidConnectionException):
+            cache.get(unsupported)
+
+    def test_invalid_output(self):
+        for output in (
+            b"not json",
+            b'{"kind": "Other"}',
+            b'{"kind": "ExecCredential", '
+            b'"apiVersion": "client.authentication.k8s.io/v1", "status": {}}',
+            b'{"kind": "ExecCredential", '
+            b'"apiVersion": "client.authentication.k8s.io/v1", "status": '
+            b'{"token": "token", "clientCertificateData": "certificate"}}',
+        ):
+            with self.assertRaises(model.InvalidConnectionException):
+                exec_credential._parse_exec_credential(
+                    self.exec_config(), output
+                )
+
+    def test_connect(self):
+        self.addCleanup(exec_credential.default_exec_credential_cache.clear)
+        kubeconfig = convert.parse_kubeconfig(convert.test_kubeconfig())
+        user = kubeconfig.users[0].user
+        user.token = None
+        user.username = None
+        user.password = None
+        user.exec = self.exec_config()
+        data = model.get_kubeconfig_schema().serialize(kubeconfig)
+        self.assertEqual(
+            data["users"][0]["user"]["exec"]["apiVersion"],
+            "client.authentication.k8s.io/v1",
+        )
+        connection = convert.kubeconfig_to_connection(
+            model.get_kubeconfig_schema().unserialize(data)
+        )
+        self.assertEqual(connection.exec, user.exec)
+        self.assertEqual(
+            convert.connection_to_kubeconfig(connection).users[0].user.exec,
+            user.exec,
+        )
+
+        for _ in range(2):
+            api_client = convert.connect(connection)
+            try:
+                self.assertEqual(
+                    api_client.configuration.get_api_key_with_prefix(
+                        "authorization"
+                    ),
+                    "Bearer token-1",
+                )
+            finally:
+                api_client.close()
+        self.assertEqual(self.runs(), 1)
+
+    def test_certificate_rotation(self):
+        self.addCleanup(exec_credential.default_exec_credential_cache.clear)
+        server = StubServer()
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        self.addCleanup(thread.join)
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        cert = os.path.join(os.path.dirname(self.plugin), "client.crt")
+        key = os.path.join(os.path.dirname(self.plugin), "client.key")
+        shutil.copy(os.path.join(TEST_DATA, "client.crt"), cert)
+        shutil.copy(os.path.join(TEST_DATA, "client.key"), key)
+        clock = FakeClock(1000000.0)
+        clock.now = time.time()
+        with open(os.path.join(TEST_DATA, "server.crt")) as f:
+            cacert = f.read()
+        connection = model.ConnectionParameters(
+            f"https://127.0.0.1:{server.server_address[1]}",
+            cacert=cacert,
+            exec=self.exec_config(
+                STUB_CERT=cert,
+                STUB_KEY=key,
+                STUB_EXPIRATION=str(clock.now + 100),
+                STUB_EXPIRATION_STEP="100",
+            ),
+        )
+        with mock.patch.object(
+            exec_credential.default_exec_credential_cache, "_clock", clock
+        ):
+            api_client = convert.connect(connection)
+            self.addCleanup(api_client.close)
+            pool_manager = api_client.rest_client.pool_manager
+
+            def get():
+                return api_client.call_api(
+                    "/version",
+                    "GET",
+                    response_type="object",
+                    _return_http_data_only=True,
+                )
+
+            def current_cert():
+                with open(api_client.configuration.cert_file) as f:
+                    return f.read()
+
+            self.assertEqual(get(), VERSION)
+            with open(cert) as f:
+                self.assertEqual(current_cert(), f.read())
+            context = pool_manager.connection_pool_kw["ssl_context"]
+
+            shutil.copy(os.path.join(TEST_DATA, "server.crt"), cert)
+            shutil.copy(os.path.join(TEST_DATA, "server.key"), key)
+            self.assertEqual(get(), VERSION)
+            self.assertEqual(self.runs(), 1)
+
+            clock.now += 95
+            self.assertEqual(get(), VERSION)
+            self.assertEqual(self.runs(), 2)
+            with open(cert) as f:
+                self.assertEqual(current_cert(), f.read())
+            self.assertIsNot(
+                pool_manager.connection_pool_kw["ssl_context"], context
+            )
+
+
+def load_tests(loader, tests, ignore):
+    """
+    This function adds the doctests to the discovery process.
+    """
+    tests.addTests(doctest.DocTestSuite(exec_credential))
+    return tests
+
+
+if __name__ == "__main__":
+    unittest.main()
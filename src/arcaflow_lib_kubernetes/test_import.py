@@ -0,0 +1,55 @@
+import os
+import subprocess
+import sys
+import unittest
+
+
+def import_time(module: str) -> subprocess.CompletedProcess:
+    """
+    This function imports a module in a fresh interpreter with -X importtime and returns the finished process. The
+    import time report is written to stderr.
+    """  # NOQA
+    root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=root_dir,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def cumulative_us(report: str, module: str) -> int:
+    for line in report.splitlines():
+        parts = [part.strip() for part in line.split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1])
+    raise Exception(f"{module} not found in import time report")
+
+
+class TestImport(unittest.TestCase):
+    def test_convert_does_not_import_kubernetes(self):
+        report = import_time("arcaflow_lib_kubernetes.convert").stderr
+        imported = [
+            line.split("|")[2].strip()
+            for line in report.splitlines()
+            if line.count("|") == 2
+        ]
+        package_us = cumulative_us(report, "arcaflow_lib_kubernetes")
+        message = f"cold import took {package_us} us"
+        self.assertNotIn("kubernetes", imported, message)
+        self.assertNotIn("kubernetes.client", imported, message)
+
+    def test_package_does_not_import_asyncio(self):
+        report = import_time("arcaflow_lib_kubernetes").stderr
+        imported = [
+            line.split("|")[2].strip()
+            for line in report.splitlines()
+            if line.count("|") == 2
+        ]
+        self.assertNotIn("asyncio", imported)
+        self.assertNotIn("kubernetes", imported)
+
+
+if __name__ == "__main__":
+    unittest.main()
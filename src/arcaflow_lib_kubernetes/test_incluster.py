@@ -0,0 +1,91 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from . import convert, incluster
+from .model import InvalidConnectionException
+from .test_convert import TestFixtures
+
+
+class TestInClusterConnection(unittest.TestCase):
+    fixtures = TestFixtures()
+    environ = {
+        "KUBERNETES_SERVICE_HOST": "10.0.0.1",
+        "KUBERNETES_SERVICE_PORT": "443",
+    }
+
+    def setUp(self):
+        incluster.clear_in_cluster_cache()
+        self.mount = tempfile.TemporaryDirectory()
+        for name, data in (
+            ("ca.crt", self.fixtures.caCrt),
+            ("token", self.fixtures.tokenFile),
+            ("namespace", "default"),
+        ):
+            with open(os.path.join(self.mount.name, name), "w") as f:
+                f.write(data)
+
+    def tearDown(self):
+        incluster.clear_in_cluster_cache()
+        self.mount.cleanup()
+
+    def test_file_references(self):
+        connection = incluster.in_cluster_connection(
+            self.mount.name, environ=self.environ
+        )
+        self.assertEqual(connection.host, "https://10.0.0.1:443")
+        self.assertEqual(
+            connection.cacert_file, os.path.join(self.mount.name, "ca.crt")
+        )
+        self.assertEqual(
+            connection.bearer_token_file,
+            os.path.join(self.mount.name, "token"),
+        )
+        self.assertFalse(connection.insecure_skip_tls_verify)
+        api_client = convert.connect(connection)
+        self.assertEqual(
+            api_client.configuration.ssl_ca_cert, connection.cacert_file
+        )
+        api_client.close()
+
+    def test_inline(self):
+        connection = incluster.in_cluster_connection(
+            self.mount.name,
+            inline_files=True,
+            environ={
+                "KUBERNETES_SERVICE_HOST": "fd00::1",
+                "KUBERNETES_SERVICE_PORT": "6443",
+            },
+        )
+        self.assertEqual(connection.host, "https://[fd00::1]:6443")
+        self.assertEqual(connection.cacert, self.fixtures.caCrt)
+        self.assertEqual(connection.bearer_token, self.fixtures.tokenFile)
+
+    def test_cached(self):
+        with mock.patch.object(
+            incluster,
+            "get_connection_schema",
+            wraps=incluster.get_connection_schema,
+        ) as get_schema:
+            first = incluster.in_cluster_connection(
+                self.mount.name, environ=self.environ
+            )
+            second = incluster.in_cluster_connection(
+                self.mount.name, environ=self.environ
+            )
+            self.assertEqual(get_schema.call_count, 1)
+        self.assertEqual(first, second)
+        self.assertIsNot(first, second)
+
+    def test_not_in_cluster(self):
+        with self.assertRaises(InvalidConnectionException):
+            incluster.in_cluster_connection(self.mount.name, environ={})
+        with self.assertRaises(InvalidConnectionException):
+            incluster.in_cluster_connection(
+                os.path.join(self.mount.name, "missing"), environ=self.environ
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import copy
+import doctest
+import unittest
+
+from . import convert, index
+from .model import (
+    InvalidKubeConfigException,
+    KubeConfigContext,
+    KubeConfigContextParams,
+)
+
+
+class TestKubeConfigIndex(unittest.TestCase):
+    def kubeconfig(self):
+        kubeconfig = convert.parse_kubeconfig(convert.test_kubeconfig())
+        kubeconfig.contexts.append(
+            KubeConfigContext(
+                "other", KubeConfigContextParams("default", "testuser")
+            )
+        )
+        return kubeconfig
+
+    def test_lookup(self):
+        kubeconfig_index = index.KubeConfigIndex(self.kubeconfig())
+        self.assertEqual(
+            kubeconfig_index.context_names(), ["default", "other"]
+        )
+        self.assertEqual(kubeconfig_index.context("other").namespace, None)
+        self.assertEqual(
+            kubeconfig_index.user("testuser").username, "testuser"
+        )
+        with self.assertRaises(InvalidKubeConfigException):
+            kubeconfig_index.context("missing")
+        with self.assertRaises(InvalidKubeConfigException):
+            kubeconfig_index.cluster("missing")
+        with self.assertRaises(InvalidKubeConfigException):
+            kubeconfig_index.user("missing")
+
+    def test_duplicates(self):
+        kubeconfig = self.kubeconfig()
+        kubeconfig.users.append(copy.deepcopy(kubeconfig.users[0]))
+        kubeconfig.users[1].user.username = "shadowed"
+        kubeconfig_index = index.KubeConfigIndex(kubeconfig)
+        self.assertEqual(kubeconfig_index.duplicate_users, {"testuser"})
+        self.assertEqual(kubeconfig_index.duplicate_contexts, set())
+        with self.assertRaises(InvalidKubeConfigException):
+            kubeconfig_index.user("testuser")
+        with self.assertRaises(InvalidKubeConfigException):
+            convert.kubeconfig_to_connection(kubeconfig)
+
+    def test_kubeconfig_to_connection(self):
+        kubeconfig = self.kubeconfig()
+        kubeconfig_index = index.KubeConfigIndex(kubeconfig)
+        self.assertEqual(
+            convert.kubeconfig_to_connection(kubeconfig_index),
+            convert.kubeconfig_to_connection(kubeconfig),
+        )
+        self.assertEqual(
+            convert.kubeconfig_to_connection(
+                kubeconfig_index, context="other"
+            ).host,
+            "https://127.0.0.1:6443",
+        )
+        with self.assertRaises(InvalidKubeConfigException):
+            convert.kubeconfig_to_connection(
+                kubeconfig_index, context="missing"
+            )
+
+
+def load_tests(loader, tests, ignore):
+    """
+    This function adds the doctests to the discovery process.
+    """
+    tests.addTests(doctest.DocTestSuite(index))
+    return tests
+
+
+if __name__ == "__main__":
+    unittest.main()
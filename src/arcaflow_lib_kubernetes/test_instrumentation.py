@@ -0,0 +1,59 @@
+import doctest
+import unittest
+
+from . import convert, credentials, instrumentation
+from .test_convert import TestFixtures
+
+
+class TestInstrumentation(unittest.TestCase):
+    fixtures = TestFixtures()
+
+    def test_phases(self):
+        metrics = instrumentation.PhaseMetrics()
+        previous = instrumentation.set_instrumentation(metrics)
+        try:
+            kubeconfig = convert.parse_kubeconfig(self.fixtures.kubeconfig)
+            convert.kubeconfig_to_connection(kubeconfig)
+            kubeconfig = convert.parse_kubeconfig(
+                self.fixtures.kubeconfigNoData
+            )
+            connection = convert.kubeconfig_to_connection(kubeconfig)
+            convert.connect(connection, credentials.CredentialStore()).close()
+        finally:
+            instrumentation.set_instrumentation(previous)
+
+        counts = {
+            name: count for name, (count, _) in metrics.snapshot().items()
+        }
+        self.assertEqual(
+            counts,
+            {
+                "load": 2,
+                "unserialize": 2,
+                "base64_decode": 3,
+                "inline_files": 3,
+                "validate": 2,
+                "credential_write": 3,
+                "api_client": 1,
+            },
+        )
+        self.assertIn(
+            'arcaflow_kubernetes_phase_seconds_count{phase="load"} 2',
+            metrics.to_prometheus(),
+        )
+
+    def test_disabled(self):
+        self.assertIsNone(instrumentation._recorder)
+        self.assertIs(instrumentation.phase("load"), instrumentation._NO_PHASE)
+
+
+def load_tests(loader, tests, ignore):
+    """
+    This function adds the doctests to the discovery process.
+    """
+    tests.addTests(doctest.DocTestSuite(instrumentation))
+    return tests
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+import doctest
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from . import cache, convert, merge
+from .model import InvalidKubeConfigException
+
+
+def kubeconfig(context: str, user: str, password: str) -> str:
+    return (
+        convert.test_kubeconfig()
+        .replace("current-context: default", f"current-context: {context}")
+        .replace("  name: default\ncontexts", f"  name: {context}\ncontexts")
+        .replace("    cluster: default", f"    cluster: {context}")
+        .replace("  name: default\ncurrent", f"  name: {context}\ncurrent")
+        .replace("testuser", user)
+        .replace("testpassword", password)
+    )
+
+
+class TestKubeConfigLoader(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.first = os.path.join(self.directory.name, "first")
+        self.second = os.path.join(self.directory.name, "second")
+        self.write(self.first, kubeconfig("one", "shared", "first"))
+        self.write(self.second, kubeconfig("two", "shared", "second"))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    @staticmethod
+    def write(path: str, data: str, mtime_ns: int = 0):
+        with open(path, "w") as f:
+            f.write(data)
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+    def test_merge(self):
+        loader = merge.KubeConfigLoader()
+        missing = os.path.join(self.directory.name, "missing")
+        merged = loader.load([missing, self.first, self.second])
+        self.assertEqual(merged.current_context, "one")
+        self.assertEqual([c.name for c in merged.contexts], ["one", "two"])
+        self.assertEqual([c.name for c in merged.clusters], ["one", "two"])
+        self.assertEqual([u.name for u in merged.users], ["shared"])
+        self.assertEqual(merged.users[0].user.password, "first")
+        connection = convert.kubeconfig_to_connection(merged, context="two")
+        self.assertEqual(connection.password, "first")
+
+    def test_environment(self):
+        with mock.patch.dict(
+            os.environ,
+            {"KUBECONFIG": os.pathsep.join([self.second, self.first])},
+        ):
+            merged = merge.KubeConfigLoader().load()
+        self.assertEqual(merged.current_context, "two")
+        self.assertEqual(merged.users[0].user.password, "second")
+
+    def test_cached_parses(self):
+        loader = merge.KubeConfigLoader(copy_results=False)
+        with mock.patch.object(
+            cache, "parse_kubeconfig", wraps=cache.parse_kubeconfig
+        ) as parse:
+            merged = loader.load([self.first, self.second])
+            self.assertIs(merged, loader.load([self.first, self.second]))
+            self.assertEqual(parse.call_count, 2)
+
+            self.write(self.second, kubeconfig("three", "other", "x"), 1)
+            merged = loader.load([self.first, self.second])
+            self.assertEqual(parse.call_count, 3)
+            self.assertEqual(
+                [c.name for c in merged.contexts], ["one", "three"]
+            )
+
+    def test_relative_paths(self):
+        fixtures = os.path.join(
+            os.path.dirname(os.path.abspath(__file__)), "..", "testdata"
+        )
+        with open(os.path.join(fixtures, "kubeconfig-nodata.yaml")) as f:
+            template = f.read().replace("./src/testdata/", "")
+        paths = []
+        for context in ("one", "two"):
+            directory = os.path.join(self.directory.name, context)
+            os.mkdir(directory)
+            for name in ("ca.crt", "client.crt", "client.key"):
+                with open(os.path.join(fixtures, name)) as f:
+                    self.write(os.path.join(directory, name), f.read())
+            path = os.path.join(directory, "config")
+            self.write(
+                path,
+                template.replace("default", context).replace(
+                    "testuser", context
+                ),
+            )
+            paths.append(path)
+
+        merged = merge.KubeConfigLoader().load(paths)
+        for cluster, user, context in zip(
+            merged.clusters, merged.users, ("one", "two")
+        ):
+            directory = os.path.join(self.directory.name, context)
+            self.assertEqual(
+                cluster.cluster.certificate_authority,
+                os.path.join(directory, "ca.crt"),
+            )
+            self.assertEqual(
+                user.user.client_certificate,
+                os.path.join(directory, "client.crt"),
+            )
+            self.assertEqual(
+                user.user.client_key, os.path.join(directory, "client.key")
+            )
+            connection = convert.kubeconfig_to_connection(
+                merged, inline_files=False, context=context
+            )
+            self.assertEqual(
+                connection.cacert_file, os.path.join(directory, "ca.crt")
+            )
+
+    def test_no_files(self):
+        with self.assertRaises(InvalidKubeConfigException):
+            merge.KubeConfigLoader().load(
+                [os.path.join(self.directory.name, "missing")]
+            )
+
+
+def load_tests(loader, tests, ignore):
+    """
+    This function adds the doctests to the discovery process.
+    """
+    tests.addTests(doctest.DocTestSuite(merge))
+    return tests
+
+
+if __name__ == "__main__":
+    unittest.main()
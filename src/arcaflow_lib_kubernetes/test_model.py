@@ -0,0 +1,72 @@
+import pickle
+import unittest
+
+from arcaflow_plugin_sdk import plugin
+
+from . import convert, model
+
+
+class TestSchemas(unittest.TestCase):
+    def test_built_once(self):
+        self.assertEqual(
+            model.get_kubeconfig_schema(),
+            plugin.build_object_schema(model.KubeConfig),
+        )
+        self.assertIs(
+            model.get_kubeconfig_schema(), model.get_kubeconfig_schema()
+        )
+
+    def test_legacy_attributes(self):
+        self.assertIs(model.kubeconfig_schema, model.get_kubeconfig_schema())
+        self.assertIs(model.connection_schema, model.get_connection_schema())
+        self.assertIs(convert.kubeconfig_schema, model.get_kubeconfig_schema())
+        self.assertIs(convert.connection_schema, model.get_connection_schema())
+        from .convert import connection_schema, kubeconfig_schema
+
+        self.assertIs(kubeconfig_schema, model.get_kubeconfig_schema())
+        self.assertIs(connection_schema, model.get_connection_schema())
+
+    def test_legacy_star_import(self):
+        namespace = {}
+        exec(f"from {__package__} import *", namespace)
+        self.assertIs(
+            namespace["kubeconfig_schema"], model.get_kubeconfig_schema()
+        )
+        self.assertIs(
+            namespace["connection_schema"], model.get_connection_schema()
+        )
+        self.assertIs(
+            namespace["ConnectionParameters"], model.ConnectionParameters
+        )
+        self.assertIs(namespace["model"], model)
+
+
+class TestModel(unittest.TestCase):
+    def test_slots(self):
+        kubeconfig = convert.parse_kubeconfig(convert.test_kubeconfig())
+        connection = convert.kubeconfig_to_connection(kubeconfig)
+        for instance in (
+            connection,
+            kubeconfig,
+            kubeconfig.clusters[0],
+            kubeconfig.clusters[0].cluster,
+            kubeconfig.contexts[0],
+            kubeconfig.contexts[0].context,
+            kubeconfig.users[0],
+            kubeconfig.users[0].user,
+        ):
+            self.assertFalse(hasattr(instance, "__dict__"))
+        self.assertEqual(
+            model.get_kubeconfig_schema().unserialize(
+                model.get_kubeconfig_schema().serialize(kubeconfig)
+            ),
+            kubeconfig,
+        )
+        self.assertEqual(
+            pickle.loads(pickle.dumps(connection)),
+            connection,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
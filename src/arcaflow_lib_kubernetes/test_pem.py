@@ -0,0 +1,176 @@
+import base64
+import copy
+import doctest
+import os
+import pickle
+import tracemalloc
+import unittest
+from unittest import mock
+
+import yaml
+
+from . import convert, credentials, model, pem
+from ._fleet import fleet_kubeconfig
+from .test_api_client import TEST_DATA
+from .test_convert import TestFixtures
+
+
+class TestPEMData(unittest.TestCase):
+    fixtures = TestFixtures()
+
+    def test_round_trip_without_transcoding(self):
+        kubeconfig = convert.parse_kubeconfig(self.fixtures.kubeconfig)
+        connection = convert.kubeconfig_to_connection(kubeconfig)
+        self.assertIsInstance(connection.cacert, pem.PEMData)
+        kubeconfig_back = convert.connection_to_kubeconfig(connection)
+        self.assertIs(
+            kubeconfig_back.clusters[0].cluster.certificate_authority_data,
+            kubeconfig.clusters[0].cluster.certificate_authority_data,
+        )
+        self.assertIs(
+            kubeconfig_back.users[0].user.client_key_data,
+            kubeconfig.users[0].user.client_key_data,
+        )
+
+    def test_connect_writes_decoded_buffers(self):
+        kubeconfig = convert.parse_kubeconfig(self.fixtures.kubeconfigNoData)
+        connection = convert.kubeconfig_to_connection(kubeconfig)
+        store = credentials.CredentialStore()
+        with mock.patch.object(
+            store, "acquire", wraps=store.acquire
+        ) as acquire:
+            convert.connect(connection, store).close()
+            convert.connect(connection, store).close()
+        written = [call.args[0] for call in acquire.call_args_list]
+        self.assertIs(written[0], connection.cert.to_bytes())
+        self.assertIs(written[1], connection.key.to_bytes())
+        self.assertIs(written[2], connection.cacert.to_bytes())
+        # Connecting again writes the same buffers without encoding them.
+        for first, second in zip(written[:3], written[3:]):
+            self.assertIs(first, second)
+
+    def test_plain_strings(self):
+        self.assertEqual(
+            pem.pem_bytes(self.fixtures.caCrt),
+            pem.PEMData.from_bytes(
+                self.fixtures.caCrt.encode("ascii")
+            ).to_bytes(),
+        )
+        self.assertEqual(
+            pem.pem_base64(self.fixtures.caCrt),
+            pem.PEMData(self.fixtures.caCrt).to_base64(),
+        )
+
+    def test_no_copies(self):
+        data = "LS0tLS1CRUdJTi0tLS0t"
+        pem_data = pem.PEMData.from_base64(data)
+        # Only the base64 string of the kubeconfig is referenced, without a
+        # copy of the raw bytes or an instance dict.
+        self.assertFalse(hasattr(pem_data, "__dict__"))
+        self.assertFalse(hasattr(pem_data, "_bytes"))
+        self.assertIs(pem_data.to_base64(), data)
+
+    def test_utf8(self):
+        raw = "-----BEGIN----- ü".encode("utf-8")
+        pem_data = pem.PEMData.from_bytes(raw)
+        self.assertEqual(pem_data.to_bytes(), raw)
+        self.assertEqual(pem.pem_bytes(str(pem_data)), raw)
+        self.assertEqual(
+            pem.PEMData.from_base64(pem.pem_base64(str(pem_data))), pem_data
+        )
+
+    def test_copy(self):
+        data = pem.PEMData.from_base64("LS0tLS1CRUdJTi0tLS0t")
+        for duplicate in (
+            copy.deepcopy(data),
+            pickle.loads(pickle.dumps(data)),
+        ):
+            self.assertEqual(duplicate, data)
+            self.assertEqual(duplicate.to_base64(), "LS0tLS1CRUdJTi0tLS0t")
+
+
+def parsed_fleet_kubeconfig(contexts: int) -> model.KubeConfig:
+    """
+    This function parses a fleet kubeconfig whose users all have the same token. The YAML loader creates a new string
+    for every occurrence, so the contexts do not share any credentials.
+    """  # NOQA
+    return convert.parse_kubeconfig(
+        yaml.safe_dump(fleet_kubeconfig(contexts, token="shared-token"))
+    )
+
+
+class TestCredentialInterner(unittest.TestCase):
+    def test_shared(self):
+        kubeconfig = parsed_fleet_kubeconfig(3)
+        self.assertIsNot(
+            kubeconfig.users[0].user.token, kubeconfig.users[1].user.token
+        )
+        connections, errors = convert.kubeconfig_to_connections(kubeconfig)
+        self.assertEqual(errors, {})
+        first, second, third = connections.values()
+        for connection in (second, third):
+            self.assertIs(connection.cacert, first.cacert)
+            self.assertIs(connection.cert, first.cert)
+            self.assertIs(connection.key, first.key)
+            self.assertIs(connection.bearer_token, first.bearer_token)
+        self.assertIsNot(first.cacert, first.cert)
+
+        single = convert.kubeconfig_to_connection(
+            kubeconfig, context="cluster-0"
+        )
+        self.assertEqual(single, first)
+        self.assertIsNot(single.cacert, first.cacert)
+
+    def test_files_and_data(self):
+        interner = pem.CredentialInterner()
+        with open(os.path.join(TEST_DATA, "ca.crt"), "rb") as f:
+            raw = f.read()
+        from_file = interner.pem_from_bytes(raw)
+        from_data = interner.pem_from_base64(
+            base64.b64encode(raw).decode("ascii")
+        )
+        self.assertIs(from_data, from_file)
+        self.assertEqual(from_data.to_bytes(), raw)
+
+    def test_max_size(self):
+        interner = pem.CredentialInterner(max_size=2)
+        token = interner.token("first")
+        interner.token("second")
+        interner.token("third")
+        self.assertEqual(len(interner), 2)
+        self.assertIsNot(interner.token("".join(["fir", "st"])), token)
+        self.assertIsNone(interner.token(None))
+        interner.clear()
+        self.assertEqual(len(interner), 0)
+
+    def test_sublinear_memory(self):
+        per_context = {}
+        for contexts in (10, 200):
+            kubeconfig = parsed_fleet_kubeconfig(contexts)
+            tracemalloc.start()
+            try:
+                connections, _ = convert.kubeconfig_to_connections(kubeconfig)
+                per_context[contexts] = tracemalloc.get_traced_memory()[0]
+            finally:
+                tracemalloc.stop()
+            del connections
+        payload = sum(
+            os.path.getsize(os.path.join(TEST_DATA, name))
+            for name in ("ca.crt", "client.crt", "client.key")
+        )
+        growth = (per_context[200] - per_context[10]) / 190
+        # Each additional context costs less than one copy of its
+        # credentials, which it would hold without interning.
+        self.assertLess(growth, payload / 2)
+
+
+def load_tests(loader, tests, ignore):
+    """
+    This function adds the doctests to the discovery process.
+    """
+    tests.addTests(doctest.DocTestSuite(pem))
+    return tests
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import doctest
+import json
+import os
+import stat
+import tempfile
+import unittest
+from unittest import mock
+
+import yaml
+
+from . import convert, model, pem, serialize
+
+
+class TestSerialize(unittest.TestCase):
+    kubeconfig = convert.parse_kubeconfig(convert.test_kubeconfig())
+
+    def test_matches_schema(self):
+        connection = convert.kubeconfig_to_connection(self.kubeconfig)
+        for kubeconfig in (
+            self.kubeconfig,
+            convert.connection_to_kubeconfig(connection),
+        ):
+            expected = model.get_kubeconfig_schema().serialize(kubeconfig)
+            self.assertEqual(
+                serialize.kubeconfig_to_document(kubeconfig), expected
+            )
+            self.assertEqual(
+                yaml.safe_load(serialize.serialize_kubeconfig(kubeconfig)),
+                expected,
+            )
+            self.assertEqual(
+                json.loads(serialize.serialize_kubeconfig(kubeconfig, "json")),
+                expected,
+            )
+
+    def test_string_subclasses(self):
+        kubeconfig = convert.parse_kubeconfig(convert.test_kubeconfig())
+        kubeconfig.users[0].user.token = pem.PEMData("token")
+        data = serialize.serialize_kubeconfig(kubeconfig)
+        self.assertEqual(
+            convert.parse_kubeconfig(data).users[0].user.token, "token"
+        )
+
+    def test_unsupported_format(self):
+        with self.assertRaises(ValueError):
+            serialize.serialize_kubeconfig(self.kubeconfig, "toml")
+
+    def test_write(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "config")
+            serialize.write_kubeconfig(self.kubeconfig, path)
+            self.assertEqual(stat.S_IMODE(os.stat(path).st_mode), 0o600)
+            with open(path) as f:
+                self.assertEqual(
+                    convert.parse_kubeconfig(f.read()), self.kubeconfig
+                )
+
+            serialize.write_kubeconfig(self.kubeconfig, path, "json")
+            with open(path) as f:
+                self.assertEqual(
+                    convert.parse_kubeconfig(f.read()), self.kubeconfig
+                )
+            self.assertEqual(os.listdir(directory), ["config"])
+
+    def test_write_failure_keeps_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "config")
+            with open(path, "w") as f:
+                f.write("previous")
+            with mock.patch.object(
+                serialize, "dump_kubeconfig", side_effect=OSError("full")
+            ):
+                with self.assertRaises(OSError):
+                    serialize.write_kubeconfig(self.kubeconfig, path)
+            with open(path) as f:
+                self.assertEqual(f.read(), "previous")
+            self.assertEqual(os.listdir(directory), ["config"])
+
+
+def load_tests(loader, tests, ignore):
+    """
+    This function adds the doctests to the discovery process.
+    """
+    tests.addTests(doctest.DocTestSuite(serialize))
+    return tests
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,192 @@
+import os
+import shutil
+import ssl
+import tempfile
+import threading
+import unittest
+
+from . import convert, model, tls
+from .test_api_client import TEST_DATA, VERSION, StubServer
+
+
+class TestSSLContextCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.cert = os.path.join(self.tmp, "server.crt")
+        self.key = os.path.join(self.tmp, "server.key")
+        shutil.copy(os.path.join(TEST_DATA, "server.crt"), self.cert)
+        shutil.copy(os.path.join(TEST_DATA, "server.key"), self.key)
+
+    def test_shared(self):
+        cache = tls.SSLContextCache()
+        context = cache.get(self.cert, self.cert, self.key, True)
+        self.assertIs(cache.get(self.cert, self.cert, self.key, True), context)
+        self.assertEqual(context.verify_mode, ssl.CERT_REQUIRED)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+        insecure = cache.get(self.cert, self.cert, self.key, False)
+        self.assertIsNot(insecure, context)
+        self.assertEqual(insecure.verify_mode, ssl.CERT_NONE)
+        self.assertIsNot(cache.get(self.cert, None, None, True), context)
+        self.assertEqual(len(cache), 3)
+
+    def test_changed_file(self):
+        cache = tls.SSLContextCache()
+        context = cache.get(self.cert, None, None, True)
+        with open(self.cert, "a") as f:
+            f.write("\n")
+        self.assertIsNot(cache.get(self.cert, None, None, True), context)
+
+    def test_eviction(self):
+        cache = tls.SSLContextCache(max_size=1)
+        context = cache.get(self.cert, None, None, True)
+        cache.get(self.cert, None, None, False)
+        self.assertEqual(len(cache), 1)
+        self.assertIsNot(cache.get(self.cert, None, None, True), context)
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+
+    def test_invalid(self):
+        cache = tls.SSLContextCache()
+        with self.assertRaises(ssl.SSLError):
+            cache.get(self.cert, self.cert, self.cert, True)
+        with self.assertRaises(OSError):
+            cache.get(os.path.join(self.tmp, "missing"), None, None, True)
+        self.assertEqual(len(cache), 0)
+
+
+class TestSharedSSLContext(unittest.TestCase):
+    def setUp(self):
+        self.server = StubServer()
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.start()
+        self.addCleanup(thread.join)
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        with open(os.path.join(TEST_DATA, "server.crt")) as f:
+            self.cacert = f.read()
+
+    def connect(self):
+        connection = model.ConnectionParameters(
+            f"https://127.0.0.1:{self.server.server_address[1]}",
+            cacert=self.cacert,
+        )
+        api_client = convert.connect(connection)
+        self.addCleanup(api_client.close)
+        return api_client
+
+    def get(self, api_client):
+        return api_client.call_api(
+            "/version",
+            "GET",
+            response_type="object",
+            _return_http_data_only=True,
+        )
+
+    def test_shared_between_clients(self):
+        first = self.connect()
+        second = self.connect()
+        first_args = first.rest_client.pool_manager.connection_pool_kw
+        second_args = second.rest_client.pool_manager.connection_pool_kw
+        self.assertIsNotNone(first_args["ssl_context"])
+        self.assertIs(first_args["ssl_context"], second_args["ssl_context"])
+        self.assertIsNone(first_args["ca_certs"])
+        self.assertEqual(self.get(first), VERSION)
+        self.assertEqual(self.get(second), VERSION)
+
+    def test_update_connection(self):
+        api_client = self.connect()
+        self.assertEqual(self.get(api_client), VERSION)
+        pool = api_client.rest_client.pool_manager.connection_from_url(
+            api_client.configuration.host
+        )
+        connection = model.ConnectionParameters(
+            api_client.configuration.host,
+            insecure_skip_tls_verify=True,
+        )
+        api_client.update_connection(connection)
+        context = pool.conn_kw["ssl_context"]
+        self.assertEqual(context.verify_mode, ssl.CERT_NONE)
+        self.assertIs(
+            api_client.rest_client.pool_manager.connection_from_url(
+                api_client.configuration.host
+            ),
+            pool,
+        )
+        self.assertEqual(self.get(api_client), VERSION)
+
+    def test_update_connection_certificate(self):
+        api_client = self.connect()
+        self.assertEqual(self.get(api_client), VERSION)
+        pool = api_client.rest_client.pool_manager.connection_from_url(
+            api_client.configuration.host
+        )
+        contexts = [pool.conn_kw["ssl_context"]]
+        for name in ("client", "server"):
+            with open(os.path.join(TEST_DATA, f"{name}.crt")) as f:
+                cert = f.read()
+            with open(os.path.join(TEST_DATA, f"{name}.key")) as f:
+                key = f.read()
+            connection = model.ConnectionParameters(
+                api_client.configuration.host,
+                cert=cert,
+                key=key,
+                cacert=self.cacert,
+            )
+            api_client.update_connection(connection)
+            context = pool.conn_kw["ssl_context"]
+            self.assertIsNotNone(context)
+            for previous in contexts:
+                self.assertIsNot(context, previous)
+            contexts.append(context)
+            self.assertEqual(self.get(api_client), VERSION)
+
+    def test_rotated_files(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        paths = {}
+        for name in ("ca.crt", "client.crt", "client.key"):
+            paths[name] = os.path.join(directory, name)
+        shutil.copy(os.path.join(TEST_DATA, "server.crt"), paths["ca.crt"])
+        shutil.copy(os.path.join(TEST_DATA, "client.crt"), paths["client.crt"])
+        shutil.copy(os.path.join(TEST_DATA, "client.key"), paths["client.key"])
+        connection = model.ConnectionParameters(
+            f"https://127.0.0.1:{self.server.server_address[1]}",
+            cacert_file=paths["ca.crt"],
+            cert_file=paths["client.crt"],
+            key_file=paths["client.key"],
+        )
+        api_client = convert.connect(connection)
+        self.addCleanup(api_client.close)
+        self.assertEqual(self.get(api_client), VERSION)
+        pool = api_client.rest_client.pool_manager.connection_from_url(
+            api_client.configuration.host
+        )
+        pooled = pool._get_conn()
+        previous = pooled.ssl_context
+        self.assertIsNotNone(previous)
+        pool._put_conn(pooled)
+
+        shutil.copy(os.path.join(TEST_DATA, "server.crt"), paths["client.crt"])
+        shutil.copy(os.path.join(TEST_DATA, "server.key"), paths["client.key"])
+        # Drop the pooled connection, so the next request reconnects.
+        pooled = pool._get_conn()
+        pooled.close()
+        pool._put_conn(pooled)
+        self.assertEqual(self.get(api_client), VERSION)
+
+        pooled = pool._get_conn()
+        self.assertIsNot(pooled.ssl_context, previous)
+        self.assertIs(
+            pooled.ssl_context,
+            tls.default_ssl_context_cache.get(
+                paths["ca.crt"], paths["client.crt"], paths["client.key"], True
+            ),
+        )
+        self.assertIsNone(pooled.cert_file)
+        pool._put_conn(pooled)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,167 @@
+import base64
+import doctest
+import json
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from . import convert, model, token_source
+from .test_cache import FakeClock
+
+
+def jwt(expiration: float) -> str:
+    def encode(data: dict) -> str:
+        return (
+            base64.urlsafe_b64encode(json.dumps(data).encode("utf-8"))
+            .decode("ascii")
+            .rstrip("=")
+        )
+
+    return ".".join(
+        (encode({"alg": "RS256"}), encode({"exp": expiration}), "signature")
+    )
+
+
+class TestTokenFileSource(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "token")
+
+    def write(self, token: str):
+        with open(self.path, "w") as f:
+            f.write(token + "\n")
+
+    def wait_for(self, source: token_source.TokenFileSource, token: str):
+        deadline = time.monotonic() + 5
+        while source.token != token:
+            self.assertLess(time.monotonic(), deadline)
+            time.sleep(0.01)
+
+    def test_cached_between_refreshes(self):
+        clock = FakeClock(1000000.0)
+        self.write("first")
+        source = token_source.TokenFileSource(
+            self.path, refresh_interval=60, clock=clock
+        )
+        self.write("second")
+        clock.now += 59
+        with mock.patch("builtins.open", side_effect=AssertionError):
+            self.assertEqual(source.token, "first")
+        clock.now += 1
+        self.wait_for(source, "second")
+
+    def test_refresh_before_expiration(self):
+        clock = FakeClock(1000000.0)
+        first = jwt(clock.now + 600)
+        self.write(first)
+        source = token_source.TokenFileSource(
+            self.path, refresh_interval=3600, refresh_margin=60, clock=clock
+        )
+        second = jwt(clock.now + 1200)
+        self.write(second)
+        clock.now += 539
+        self.assertEqual(source.token, first)
+        clock.now += 1
+        self.wait_for(source, second)
+
+    def test_unrotated_token_backs_off(self):
+        clock = FakeClock(1000000.0)
+        first = jwt(clock.now + 40)
+        self.write(first)
+        source = token_source.TokenFileSource(
+            self.path, refresh_interval=3600, refresh_margin=60, clock=clock
+        )
+        with mock.patch.object(source, "_refresh_in_background") as refresh:
+            for _ in range(100):
+                self.assertEqual(source.token, first)
+            refresh.assert_not_called()
+            clock.now += 20
+            self.assertEqual(source.token, first)
+            refresh.assert_called_once()
+        source._refresh()
+        with mock.patch.object(source, "_refresh_in_background") as refresh:
+            clock.now += 9
+            self.assertEqual(source.token, first)
+            refresh.assert_not_called()
+            clock.now += 1
+            self.assertEqual(source.token, first)
+            refresh.assert_called_once()
+
+    def test_expired_token_read_synchronously(self):
+        clock = FakeClock(1000000.0)
+        self.write(jwt(clock.now + 600))
+        source = token_source.TokenFileSource(self.path, clock=clock)
+        second = jwt(clock.now + 1200)
+        self.write(second)
+        clock.now += 600
+        self.assertEqual(source.token, second)
+
+    def test_failed_refresh_keeps_token(self):
+        clock = FakeClock(1000000.0)
+        self.write("first")
+        source = token_source.TokenFileSource(
+            self.path, refresh_interval=60, clock=clock
+        )
+        os.unlink(self.path)
+        clock.now += 60
+        with self.assertLogs(level="WARNING"):
+            self.assertEqual(source.token, "first")
+            deadline = time.monotonic() + 5
+            while source._refreshing:
+                self.assertLess(time.monotonic(), deadline)
+                time.sleep(0.01)
+        self.assertEqual(source.token, "first")
+        self.write("second")
+        clock.now += 60
+        self.wait_for(source, "second")
+
+    def test_unreadable(self):
+        with self.assertRaises(model.InvalidKubeConfigException):
+            token_source.TokenFileSource(self.path)
+
+    def test_connect(self):
+        first = jwt(time.time() + 1)
+        self.write(first)
+        connection = model.ConnectionParameters(
+            "https://127.0.0.1:6443", bearer_token_file=self.path
+        )
+        api_client = convert.connect(connection)
+        self.addCleanup(api_client.close)
+        configuration = api_client.configuration
+        self.assertEqual(configuration.api_key, {"authorization": first})
+        self.assertEqual(
+            configuration.get_api_key_with_prefix("authorization"),
+            f"Bearer {first}",
+        )
+
+        second = jwt(time.time() + 3600)
+        self.write(second)
+        deadline = time.monotonic() + 5
+        while (
+            configuration.get_api_key_with_prefix("authorization")
+            != f"Bearer {second}"
+        ):
+            self.assertLess(time.monotonic(), deadline)
+            time.sleep(0.01)
+
+    def test_connect_unreadable(self):
+        connection = model.ConnectionParameters(
+            "https://127.0.0.1:6443", bearer_token_file=self.path
+        )
+        with self.assertRaises(model.InvalidKubeConfigException):
+            convert.connect(connection)
+
+
+def load_tests(loader, tests, ignore):
+    """
+    This function adds the doctests to the discovery process.
+    """
+    tests.addTests(doctest.DocTestSuite(token_source))
+    return tests
+
+
+if __name__ == "__main__":
+    unittest.main()
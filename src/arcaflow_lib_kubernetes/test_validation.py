@@ -0,0 +1,109 @@
+import dataclasses
+import doctest
+import unittest
+from unittest import mock
+
+from . import convert, model, validation
+
+
+class TestValidationCache(unittest.TestCase):
+    kubeconfig = convert.parse_kubeconfig(convert.test_kubeconfig())
+
+    def test_skips_repeated_validation(self):
+        validation_cache = validation.ValidationCache()
+        first = convert.kubeconfig_to_connection(
+            self.kubeconfig, validation_cache=validation_cache
+        )
+        second = convert.kubeconfig_to_connection(
+            self.kubeconfig, validation_cache=validation_cache
+        )
+        self.assertEqual(first, second)
+        self.assertEqual(validation_cache.misses, 1)
+        self.assertEqual(validation_cache.hits, 1)
+
+        validation_cache.validate(
+            dataclasses.replace(first, bearer_token="other")
+        )
+        self.assertEqual(validation_cache.misses, 2)
+
+    def test_invalid_connection(self):
+        kubeconfig = convert.parse_kubeconfig(convert.test_kubeconfig())
+        kubeconfig.clusters[0].cluster.server = None
+        validation_cache = validation.ValidationCache()
+        errors = []
+        for cache in (None, validation_cache, validation_cache):
+            with self.assertRaises(model.UnusableKubeConfigException) as e:
+                convert.kubeconfig_to_connection(
+                    kubeconfig, validation_cache=cache
+                )
+            errors.append(e.exception.__str__())
+        self.assertEqual(len(set(errors)), 1)
+        self.assertEqual(len(validation_cache), 0)
+
+    def test_value_types(self):
+        validation_cache = validation.ValidationCache()
+        validation_cache.validate(
+            model.ConnectionParameters("https://127.0.0.1:6443")
+        )
+        connection = model.ConnectionParameters("https://127.0.0.1:6443")
+        connection.insecure_skip_tls_verify = 0
+        with self.assertRaises(Exception):
+            validation_cache.validate(connection)
+
+    def test_eviction(self):
+        validation_cache = validation.ValidationCache(max_size=2)
+        for host in ("https://a", "https://b", "https://c", "https://a"):
+            validation_cache.validate(model.ConnectionParameters(host))
+        self.assertEqual(len(validation_cache), 2)
+        self.assertEqual(validation_cache.misses, 4)
+        validation_cache.clear()
+        self.assertEqual(len(validation_cache), 0)
+
+    def test_no_credentials(self):
+        validation_cache = validation.ValidationCache()
+        connection = convert.kubeconfig_to_connection(self.kubeconfig)
+        connection.bearer_token = "".join(["secret-", "token"])
+        validation_cache.validate(connection)
+        values = [
+            value
+            for key in validation_cache._validated
+            for _, value in key[1:]
+        ]
+        for secret in (
+            connection.password,
+            connection.key,
+            connection.bearer_token,
+        ):
+            self.assertIsNotNone(secret)
+            self.assertFalse(any(value is secret for value in values))
+            self.assertNotIn(secret, values)
+        validation_cache.validate(dataclasses.replace(connection))
+        self.assertEqual(validation_cache.hits, 1)
+
+    def test_batch(self):
+        kubeconfig = convert.parse_kubeconfig(convert.test_kubeconfig())
+        kubeconfig.contexts.append(
+            model.KubeConfigContext("other", kubeconfig.contexts[0].context)
+        )
+        with mock.patch.object(
+            convert,
+            "_context_to_connection",
+            side_effect=convert._context_to_connection,
+        ) as context_to_connection:
+            connections, errors = convert.kubeconfig_to_connections(kubeconfig)
+        self.assertEqual(errors, {})
+        self.assertEqual(connections["default"], connections["other"])
+        self.assertIsNot(connections["default"], connections["other"])
+        self.assertEqual(context_to_connection.call_count, 1)
+
+
+def load_tests(loader, tests, ignore):
+    """
+    This function adds the doctests to the discovery process.
+    """
+    tests.addTests(doctest.DocTestSuite(validation))
+    return tests
+
+
+if __name__ == "__main__":
+    unittest.main()
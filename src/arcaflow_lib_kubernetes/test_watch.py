@@ -0,0 +1,166 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from . import watch
+from .test_convert import TestFixtures
+
+
+class TestKubeConfigWatcher(unittest.TestCase):
+    fixtures = TestFixtures()
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        root_dir = os.path.dirname(os.path.abspath(__file__))
+        for name in ("ca.crt", "client.crt", "client.key"):
+            shutil.copy(
+                os.path.join(root_dir, "../testdata", name),
+                os.path.join(self.directory.name, name),
+            )
+        self.path = self.file("kubeconfig")
+        self.write_kubeconfig("testpassword")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def file(self, name: str) -> str:
+        return os.path.join(self.directory.name, name)
+
+    def write(self, path: str, data: str, mtime_ns: int = 0):
+        with open(path, "w") as f:
+            f.write(data)
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+    def write_kubeconfig(
+        self, password: str, mtime_ns: int = 0, failing_exec: bool = False
+    ):
+        data = self.fixtures.kubeconfigNoData.replace(
+            "./src/testdata/", self.directory.name + "/"
+        ).replace("testpassword", password)
+        if failing_exec:
+            exec_config = {
+                "apiVersion": "client.authentication.k8s.io/v1",
+                "command": sys.executable,
+                "args": ["-c", "import sys; sys.exit(1)"],
+            }
+            data += f"      exec: {json.dumps(exec_config)}\n"
+        self.write(self.path, data, mtime_ns)
+
+    def test_referenced_file_change(self):
+        watcher = watch.KubeConfigWatcher(self.path)
+        api_client = watcher.connect()
+        pool_manager = api_client.rest_client.pool_manager
+        pool = pool_manager.connection_from_url(api_client.configuration.host)
+        self.assertFalse(watcher.check())
+
+        self.write(self.file("client.crt"), self.fixtures.caCrt, 1)
+        self.assertTrue(watcher.check())
+        self.assertEqual(watcher.connection.cert, self.fixtures.caCrt)
+        self.assertIs(
+            pool,
+            pool_manager.connection_from_url(api_client.configuration.host),
+        )
+        with open(api_client.configuration.cert_file) as f:
+            self.assertEqual(f.read(), self.fixtures.caCrt)
+        self.assertEqual(pool.cert_file, api_client.configuration.cert_file)
+        self.assertEqual(
+            pool_manager.connection_pool_kw["cert_file"], pool.cert_file
+        )
+        api_client.close()
+
+    def test_kubeconfig_change(self):
+        changes = []
+        watcher = watch.KubeConfigWatcher(self.path, on_change=changes.append)
+        api_client = watcher.connect()
+        self.write_kubeconfig("newpassword", 1)
+        self.assertTrue(watcher.check())
+        self.assertEqual(api_client.configuration.password, "newpassword")
+        self.assertEqual([c.password for c in changes], ["newpassword"])
+
+        self.write(self.path, "invalid: [", 2)
+        with self.assertLogs(level="WARNING"):
+            self.assertFalse(watcher.check())
+        self.assertEqual(watcher.connection.password, "newpassword")
+        api_client.close()
+
+    def test_client_update_failure(self):
+        changes = []
+        watcher = watch.KubeConfigWatcher(self.path, on_change=changes.append)
+        api_client = watcher.connect()
+        configuration = api_client.configuration
+
+        self.write_kubeconfig("newpassword", 1, failing_exec=True)
+        with self.assertLogs(level="WARNING"):
+            self.assertFalse(watcher.check())
+        self.assertEqual(watcher.connection.password, "testpassword")
+        self.assertIsNone(watcher.connection.exec)
+        self.assertIs(api_client.configuration, configuration)
+        self.assertEqual(changes, [])
+
+        self.write_kubeconfig("fixedpassword", 2)
+        self.assertTrue(watcher.check())
+        self.assertEqual(api_client.configuration.password, "fixedpassword")
+        self.assertEqual([c.password for c in changes], ["fixedpassword"])
+        api_client.close()
+
+    def test_client_update_retried(self):
+        watcher = watch.KubeConfigWatcher(self.path)
+        api_client = watcher.connect()
+        self.write_kubeconfig("newpassword", 1)
+        with mock.patch.object(
+            api_client,
+            "update_connection",
+            side_effect=RuntimeError("transient failure"),
+        ):
+            with self.assertLogs(level="WARNING"):
+                self.assertFalse(watcher.check())
+            with self.assertLogs(level="WARNING"):
+                self.assertFalse(watcher.check())
+        self.assertEqual(watcher.connection.password, "testpassword")
+
+        self.assertTrue(watcher.check())
+        self.assertEqual(watcher.connection.password, "newpassword")
+        self.assertEqual(api_client.configuration.password, "newpassword")
+        self.assertFalse(watcher.check())
+        api_client.close()
+
+    def test_on_change_failure(self):
+        changed = threading.Event()
+
+        def on_change(connection):
+            changed.set()
+            raise RuntimeError("handler failed")
+
+        watcher = watch.KubeConfigWatcher(
+            self.path, poll_interval=0.05, on_change=on_change
+        )
+        api_client = watcher.connect()
+        with self.assertLogs(level="WARNING"), watcher:
+            self.write_kubeconfig("newpassword", 1)
+            self.assertTrue(changed.wait(5))
+            changed.clear()
+            self.write_kubeconfig("otherpassword", 2)
+            self.assertTrue(changed.wait(5))
+        self.assertEqual(api_client.configuration.password, "otherpassword")
+        api_client.close()
+
+    def test_background(self):
+        changed = threading.Event()
+        watcher = watch.KubeConfigWatcher(
+            self.path,
+            poll_interval=0.05,
+            on_change=lambda connection: changed.set(),
+        )
+        with watcher:
+            self.write_kubeconfig("newpassword", 1)
+            self.assertTrue(changed.wait(5))
+        self.assertEqual(watcher.connection.password, "newpassword")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+import hashlib
+import ssl
+import threading
+import typing
+
+from .cache import LRUCache
+from .instrumentation import phase
+
+
+def _file_digest(path: typing.Optional[str]) -> typing.Optional[bytes]:
+    if path is None:
+        return None
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).digest()
+
+
+class SSLContextCache:
+    """
+    This class shares one SSL context between all clients with the same certificate authority, client certificate,
+    client key and verification setting, so that the files are loaded and parsed once rather than for every
+    connection. Files are identified by their content, since credential store paths are reused for other content and
+    files such as rotated certificates change in place. Hashing a file is much cheaper than parsing it. The least
+    recently used contexts are evicted once max_size is reached.
+    """  # NOQA
+
+    def __init__(self, max_size: int = 64):
+        """
+        :param max_size: The maximum number of SSL contexts to keep.
+        """
+        self._contexts = LRUCache(max_size)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(
+        self,
+        ca_certs: typing.Optional[str],
+        cert_file: typing.Optional[str],
+        key_file: typing.Optional[str],
+        verify: bool,
+    ) -> ssl.SSLContext:
+        """
+        This function returns the SSL context for the given TLS material, creating it if it is not cached.
+
+        :param ca_certs: The file holding the certificate authorities to trust.
+        :param cert_file: The file holding the client certificate.
+        :param key_file: The file holding the client key.
+        :param verify: Verify the certificate of the server.
+        :return: the SSL context. It must not be modified.
+        :raises OSError: If a file is not readable.
+        :raises ssl.SSLError: If a file does not hold valid TLS material.
+        """  # NOQA
+        key = (
+            _file_digest(ca_certs),
+            _file_digest(cert_file),
+            _file_digest(key_file),
+            verify,
+        )
+        context = self._contexts.get(key)
+        if context is not None:
+            with self._lock:
+                self.hits += 1
+            return context
+        with self._lock:
+            self.misses += 1
+        with phase("ssl_context"):
+            context = _create_context(ca_certs, cert_file, key_file, verify)
+        self._contexts.put(key, context)
+        return context
+
+    def clear(self) -> None:
+        """
+        This function drops all cached SSL contexts.
+        """
+        self._contexts.clear()
+
+    def __len__(self) -> int:
+        return len(self._contexts)
+
+
+def _create_context(
+    ca_certs: typing.Optional[str],
+    cert_file: typing.Optional[str],
+    key_file: typing.Optional[str],
+    verify: bool,
+) -> ssl.SSLContext:
+    """
+    This function creates an SSL context with the same settings urllib3 uses for its own contexts.
+    """  # NOQA
+    from urllib3.util.ssl_ import create_urllib3_context
+
+    context = create_urllib3_context(
+        cert_reqs=ssl.CERT_REQUIRED if verify else ssl.CERT_NONE
+    )
+    if ca_certs is not None:
+        context.load_verify_locations(cafile=ca_certs)
+    elif verify:
+        context.load_default_certs()
+    if cert_file is not None:
+        context.load_cert_chain(cert_file, key_file)
+    return context
+
+
+default_ssl_context_cache = SSLContextCache()
@@ -0,0 +1,99 @@
+import collections
+import dataclasses
+import threading
+import typing
+
+from .model import ConnectionParameters, get_connection_schema
+
+_CONNECTION_FIELDS = tuple(
+    field.name for field in dataclasses.fields(ConnectionParameters)
+)
+
+# The values of these fields are only remembered by their hash, so that the
+# cache does not keep credentials alive. The exec configuration may hold
+# credentials in its environment variables.
+_SECRET_FIELDS = frozenset(("password", "key", "bearer_token", "exec"))
+
+
+def _validation_key(connection: ConnectionParameters) -> typing.Tuple:
+    """
+    This function returns the fingerprint a validation result is remembered by. It holds the type of every field
+    value, since e.g. 1 and True compare equal but only one of them passes validation. Unhashable values such as the
+    exec configuration are represented by their repr, and credentials by their hash. Computing it is much cheaper than
+    a cryptographic digest since the hashes of strings are cached.
+    """  # NOQA
+    key: typing.List[typing.Any] = [type(connection)]
+    for name in _CONNECTION_FIELDS:
+        value = getattr(connection, name)
+        value_type = type(value)
+        if value is not None:
+            if value_type.__hash__ is None:
+                value = repr(value)
+            if name in _SECRET_FIELDS:
+                value = hash(value)
+        key.append((value_type, value))
+    return tuple(key)
+
+
+class ValidationCache:
+    """
+    This class validates connection parameters against the connection schema and remembers the fingerprints of the
+    parameters that passed, so that validating the same parameters again is skipped. Parameters that fail validation
+    are not remembered and raise the same exception on every call. Passwords, keys, tokens and exec configurations
+    are only remembered by their hash, so the cache does not keep credentials in memory.
+
+    Example usage:
+
+    >>> validation_cache = ValidationCache()
+    >>> connection = ConnectionParameters("https://127.0.0.1:6443")
+    >>> validation_cache.validate(connection)
+    >>> validation_cache.validate(ConnectionParameters("https://127.0.0.1:6443"))
+    >>> validation_cache.hits, validation_cache.misses
+    (1, 1)
+    """  # NOQA
+
+    def __init__(self, max_size: int = 4096):
+        """
+        :param max_size: The maximum number of fingerprints to remember.
+        """
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._validated: collections.OrderedDict = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def validate(self, connection: ConnectionParameters) -> None:
+        """
+        This function validates the connection parameters unless parameters with the same fingerprint already passed.
+
+        :param connection: The connection parameters to validate.
+        :raises ConstraintException: If the connection parameters are invalid.
+        """  # NOQA
+        key = _validation_key(connection)
+        with self._lock:
+            if key in self._validated:
+                self._validated.move_to_end(key)
+                self.hits += 1
+                return
+            self.misses += 1
+        get_connection_schema().validate(connection)
+        with self._lock:
+            self._validated[key] = None
+            while len(self._validated) > self.max_size:
+                self._validated.popitem(last=False)
+
+    def clear(self) -> None:
+        """
+        This function forgets all validated fingerprints.
+        """
+        with self._lock:
+            self._validated.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._validated)
+
+
+default_validation_cache = ValidationCache()
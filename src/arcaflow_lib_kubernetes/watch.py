@@ -0,0 +1,330 @@
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import threading
+import typing
+import weakref
+
+from .convert import connect, kubeconfig_to_connection, parse_kubeconfig
+from .credentials import CredentialStore
+from .index import KubeConfigIndex
+from .model import (
+    ConnectionParameters,
+    InvalidKubeConfigException,
+    KubeConfig,
+    KubeConfigException,
+)
+
+if typing.TYPE_CHECKING:
+    from kubernetes import client
+
+_IN_MODIFY = 0x00000002
+_IN_ATTRIB = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_NONBLOCK = os.O_NONBLOCK
+_IN_CLOEXEC = 0o2000000
+_IN_MASK = (
+    _IN_MODIFY
+    | _IN_ATTRIB
+    | _IN_CLOSE_WRITE
+    | _IN_MOVED_TO
+    | _IN_CREATE
+    | _IN_DELETE
+)
+
+
+class _Inotify:
+    """
+    This class watches directories with Linux inotify. It only signals that something changed; which file changed is
+    determined by comparing file stats. Directories rather than files are watched so that files replaced by rename
+    (e.g. mounted secrets) are noticed.
+    """  # NOQA
+
+    def __init__(self):
+        libc_name = ctypes.util.find_library("c")
+        if libc_name is None:
+            raise OSError("libc not found")
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._fd = self._libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._directories: typing.Set[str] = set()
+
+    def watch(self, directories: typing.Iterable[str]) -> None:
+        for directory in directories:
+            if directory in self._directories:
+                continue
+            if (
+                self._libc.inotify_add_watch(
+                    self._fd, os.fsencode(directory), _IN_MASK
+                )
+                >= 0
+            ):
+                self._directories.add(directory)
+
+    def wait(self, timeout: float) -> None:
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if readable:
+            try:
+                while os.read(self._fd, 4096):
+                    pass
+            except BlockingIOError:
+                pass
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+def _file_version(path: str) -> typing.Optional[typing.Tuple]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+def _referenced_files(
+    kubeconfig: KubeConfig, context: typing.Optional[str]
+) -> typing.List[str]:
+    """
+    This function returns the certificate authority, certificate and key files referenced by a context.
+    """  # NOQA
+    try:
+        index = KubeConfigIndex(kubeconfig)
+        context_params = index.context(context or kubeconfig.current_context)
+        cluster = index.cluster(context_params.cluster)
+        user = index.user(context_params.user)
+    except KubeConfigException:
+        return []
+    return [
+        path
+        for path in (
+            cluster.certificate_authority,
+            user.client_certificate,
+            user.client_key,
+        )
+        if path is not None
+    ]
+
+
+class KubeConfigWatcher:
+    """
+    This class keeps the connection parameters of a kubeconfig file up to date. When the kubeconfig file or a
+    certificate authority, certificate or key file it references changes, the connection parameters are converted
+    again; the kubeconfig is only re-parsed if the kubeconfig file itself changed. Clients created with connect() are
+    switched to the new credentials in place, keeping their connection pools.
+
+    Changes are picked up by calling check(), or in the background after start(). The background thread uses inotify
+    where available and polls file modification times otherwise.
+    """  # NOQA
+
+    connection: ConnectionParameters
+
+    def __init__(
+        self,
+        path: str,
+        context: typing.Optional[str] = None,
+        inline_files: bool = True,
+        poll_interval: float = 1.0,
+        credential_store: typing.Optional[CredentialStore] = None,
+        on_change: typing.Optional[
+            typing.Callable[[ConnectionParameters], None]
+        ] = None,
+    ):
+        """
+        :param path: The kubeconfig file to watch.
+        :param context: The name of the context to convert. Defaults to the current context of the kubeconfig.
+        :param inline_files: Inline referenced external files (e.g. certificates).
+        :param poll_interval: The maximum number of seconds between two checks in the background.
+        :param credential_store: The store to write inline credentials to. Defaults to default_credential_store.
+        :param on_change: A function called with the new connection parameters after every change.
+        :raises KubeConfigException: If the kubeconfig cannot be loaded initially.
+        """  # NOQA
+        self.path = path
+        self.context = context
+        self.inline_files = inline_files
+        self.poll_interval = poll_interval
+        self.credential_store = credential_store
+        self.on_change = on_change
+        self._clients: weakref.WeakSet = weakref.WeakSet()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: typing.Optional[threading.Thread] = None
+
+        self._kubeconfig = self._parse()
+        self._files = [self.path] + _referenced_files(
+            self._kubeconfig, self.context
+        )
+        self._versions = [_file_version(f) for f in self._files]
+        self.connection = kubeconfig_to_connection(
+            self._kubeconfig, self.inline_files, self.context
+        )
+
+    def connect(self) -> "client.ApiClient":
+        """
+        This function creates a Kubernetes API client that follows the changes of the kubeconfig.
+
+        :return: a configured Kubernetes API Client
+        """  # NOQA
+        with self._lock:
+            api_client = connect(self.connection, self.credential_store)
+            self._clients.add(api_client)
+        return api_client
+
+    def check(self) -> bool:
+        """
+        This function checks the watched files for changes and applies them. If the changed kubeconfig cannot be
+        loaded or the clients cannot be switched to it, the previous connection parameters are kept, the error is
+        logged and the change is tried again by the next check. Errors raised by on_change are logged as well.
+
+        :return: True if the connection parameters changed.
+        """  # NOQA
+        with self._lock:
+            versions = [_file_version(f) for f in self._files]
+            if versions == self._versions:
+                return False
+            kubeconfig_changed = versions[0] != self._versions[0]
+            files = self._files
+            try:
+                kubeconfig = self._kubeconfig
+                if kubeconfig_changed:
+                    kubeconfig = self._parse()
+                    files = [self.path] + _referenced_files(
+                        kubeconfig, self.context
+                    )
+                    if files != self._files:
+                        versions = [_file_version(f) for f in files]
+                connection = kubeconfig_to_connection(
+                    kubeconfig, self.inline_files, self.context
+                )
+            except KubeConfigException as e:
+                logging.warning(
+                    f"Failed to reload kubeconfig {self.path}, "
+                    f"keeping the previous connection: {e.__str__()}"
+                )
+                return False
+            changed = connection != self.connection
+            if changed and not self._update_clients(connection):
+                return False
+            # The new file versions are only recorded once the change is
+            # applied, so that a failed change is retried by the next check.
+            self._kubeconfig = kubeconfig
+            self._files = files
+            self._versions = versions
+            if not changed:
+                return False
+            self.connection = connection
+        if self.on_change is not None:
+            try:
+                self.on_change(connection)
+            except Exception as e:
+                logging.warning(
+                    f"The change handler of the kubeconfig watcher for "
+                    f"{self.path} failed: {e.__str__()}"
+                )
+        return True
+
+    def _update_clients(self, connection: ConnectionParameters) -> bool:
+        """
+        This function switches the clients to the new connection parameters. If any of them cannot be switched, e.g.
+        because an exec credential plugin fails, the clients already switched are switched back, so that all clients
+        keep using the previous connection parameters.
+
+        :return: True if all clients were switched.
+        """  # NOQA
+        updated = []
+        for api_client in list(self._clients):
+            try:
+                api_client.update_connection(connection)
+            except Exception as e:
+                logging.warning(
+                    f"Failed to apply the changed kubeconfig {self.path}, "
+                    f"keeping the previous connection: {e.__str__()}"
+                )
+                break
+            updated.append(api_client)
+        else:
+            return True
+        for api_client in updated:
+            try:
+                api_client.update_connection(self.connection)
+            except Exception as e:
+                logging.warning(
+                    f"Failed to restore the previous connection of a "
+                    f"client of kubeconfig {self.path}: {e.__str__()}"
+                )
+        return False
+
+    def start(self) -> None:
+        """
+        This function starts checking for changes in a background thread.
+        """
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="kubeconfig-watcher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        This function stops the background thread started by start().
+        """
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def __enter__(self) -> "KubeConfigWatcher":
+        self.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+    def _run(self) -> None:
+        try:
+            inotify = _Inotify()
+        except (OSError, AttributeError):
+            inotify = None
+        try:
+            while not self._stop.is_set():
+                if inotify is not None:
+                    inotify.watch(
+                        {
+                            os.path.dirname(os.path.abspath(f))
+                            for f in self._files
+                        }
+                    )
+                    inotify.wait(self.poll_interval)
+                else:
+                    self._stop.wait(self.poll_interval)
+                if not self._stop.is_set():
+                    try:
+                        self.check()
+                    except Exception as e:
+                        logging.warning(
+                            f"Failed to check kubeconfig {self.path} for "
+                            f"changes: {e.__str__()}"
+                        )
+        finally:
+            if inotify is not None:
+                inotify.close()
+
+    def _parse(self) -> KubeConfig:
+        try:
+            with open(self.path) as f:
+                data = f.read()
+        except OSError as e:
+            raise InvalidKubeConfigException(
+                f"The kubeconfig file {self.path} was not readable: "
+                f"{e.__str__()}"
+            ) from e
+        return parse_kubeconfig(data)